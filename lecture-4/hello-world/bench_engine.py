@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from calc_engine import BINARY_OPS, ERROR, UNARY_OPS, apply, calc, evaluate  # noqa: E402
+
+N = 1_000_000
+
+
+# -------------------------
+# 入力: 普通の数 + 失敗しやすい値（負・0・巨大・inf・前の Error=NaN）
+# -------------------------
+def make_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-1000, 1000, n)
+    special = np.array([0.0, -0.0, -1.0, 1e200, -1e200, np.inf, -np.inf, np.nan, 90.0, 180.0])
+    idx = rng.choice(n, n // 20, replace=False)
+    x[idx] = rng.choice(special, len(idx))
+    return x
+
+
+def to_float(text):
+    return np.nan if text == ERROR else float(text)
+
+
+# 1つずつ: 画面と同じく 文字列 → apply / calc → 文字列
+def scalar_unary(op, x):
+    return np.array([to_float(apply(op, str(v))) for v in x.tolist()])
+
+
+def scalar_binary(op, a, b):
+    return np.array([to_float(calc(op, u, str(v))) for u, v in zip(a.tolist(), b.tolist())])
+
+
+def same(scalar, vector):
+    errors_match = np.array_equal(np.isnan(scalar), np.isnan(vector))
+    values_match = np.allclose(scalar, vector, rtol=1e-12, atol=1e-15, equal_nan=True)
+    return errors_match and values_match
+
+
+def bench_engine(n=N):
+    x = make_inputs(n)
+    y = make_inputs(n, seed=1)
+    print(f"== {n:,} values per op ==")
+    print(f"{'op':<5} {'scalar loop':>12} {'evaluate':>10} {'speedup':>8}  errors")
+
+    for op in list(UNARY_OPS) + list(BINARY_OPS):
+        binary = op in BINARY_OPS
+        start = time.perf_counter()
+        scalar = scalar_binary(op, x, y) if binary else scalar_unary(op, x)
+        t_scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vector = evaluate(op, x, y) if binary else evaluate(op, x)
+        t_vector = time.perf_counter() - start
+
+        assert same(scalar, vector), op
+        print(f"{op:<5} {t_scalar * 1000:9.0f} ms {t_vector * 1000:7.1f} ms "
+              f"{t_scalar / t_vector:7.0f}x  {int(np.isnan(vector).sum()):,}")
+
+
+if __name__ == "__main__":
+    bench_engine(int(sys.argv[1]) if len(sys.argv) > 1 else N)
@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+
+# -------------------------
+# 電卓の計算部分（画面なし）
+#   1つずつ: apply / calc（文字列で受けて文字列で返す。失敗は "Error"）
+#   まとめて: evaluate（NumPy 配列。失敗は NaN、masked=True なら mask）
+#   ボタン操作: Calculator.press
+# -------------------------
+ERROR = "Error"
+
+UNARY_OPS = {
+    "+/-": lambda x: -x,
+    "%": lambda x: x / 100,
+    "√": math.sqrt,
+    "x²": lambda x: x ** 2,
+    "sin": lambda x: math.sin(math.radians(x)),
+    "cos": lambda x: math.cos(math.radians(x)),
+    "tan": lambda x: math.tan(math.radians(x)),
+    "log": math.log10,
+    "ln": math.log,
+}
+
+BINARY_OPS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+}
+
+
+# 表示中の文字列に1項演算をかける
+def apply(op, value):
+    try:
+        return str(UNARY_OPS[op](float(value)))
+    except (ValueError, ArithmeticError):
+        return ERROR
+
+
+# stored <op> value（stored は float、value は表示中の文字列）
+def calc(op, stored, value):
+    try:
+        return str(BINARY_OPS[op](stored, float(value)))
+    except (ValueError, ArithmeticError):
+        return ERROR
+
+
+# -------------------------
+# まとめて計算（apply / calc と同じところで失敗にする）
+#   math が例外を出す入力 → NaN
+#     √: 負の数 / log, ln: 0 以下 / sin, cos, tan: ±inf
+#     x²: 有限の数が大きすぎて inf になる / ÷: 0 で割る
+#   入力の NaN（前の計算の Error）はそのまま NaN
+# -------------------------
+def _unary(op, x):
+    if op == "+/-":
+        return -x, None
+    if op == "%":
+        return x / 100, None
+    if op == "√":
+        return np.sqrt(x), x < 0
+    if op == "x²":
+        y = np.square(x)
+        return y, np.isinf(y) & np.isfinite(x)
+    if op in ("sin", "cos", "tan"):
+        return getattr(np, op)(np.radians(x)), np.isinf(x)
+    if op == "log":
+        return np.log10(x), x <= 0
+    if op == "ln":
+        return np.log(x), x <= 0
+    raise KeyError(op)
+
+
+def evaluate(op, x, y=None, masked=False):
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(all="ignore"):
+        if op in BINARY_OPS:
+            y = np.asarray(y, dtype=np.float64)
+            out = BINARY_OPS[op](x, y)
+            errors = y == 0 if op == "/" else None
+        else:
+            out, errors = _unary(op, x)
+
+        if errors is not None and errors.any():
+            out = np.where(errors, np.nan, out)
+
+    if masked:
+        return np.ma.array(out, mask=np.isnan(out))
+    return out
+
+
+# -------------------------
+# ボタン操作の状態
+#   current: 表示中の文字列 / stored, operator: 待っている2項演算
+#   new_input: 次の数字で表示を置き換えるか
+# -------------------------
+class Calculator:
+    def __init__(self):
+        self.scientific = False
+        self.clear()
+
+    def clear(self):
+        self.current = "0"
+        self.stored = None
+        self.operator = None
+        self.new_input = True
+
+    # 戻り値: 表示する文字列
+    def press(self, key):
+        # 数字
+        if key in "0123456789.":
+            if self.new_input:
+                self.current = ""
+                self.new_input = False
+            if key == "." and "." in self.current:
+                return self.current
+            self.current += key
+
+        # AC
+        elif key == "AC":
+            self.clear()
+
+        # 符号反転・%・科学計算
+        elif key in UNARY_OPS:
+            self.current = apply(key, self.current)
+            self.new_input = True
+
+        # 演算子（Error 表示中は受け付けない）
+        elif key in BINARY_OPS:
+            try:
+                self.stored = float(self.current)
+            except ValueError:
+                return self.current
+            self.operator = key
+            self.new_input = True
+
+        # =
+        elif key == "=" and self.operator:
+            self.current = calc(self.operator, self.stored, self.current)
+            self.operator = None
+            self.new_input = True
+
+        # SCI モード切替
+        elif key == "SCI":
+            self.scientific = not self.scientific
+
+        elif key == "π":
+            self.current = str(math.pi)
+            self.new_input = True
+
+        return self.current
@@ -1,5 +1,6 @@
 import flet as ft
-import math
+
+from calc_engine import Calculator
 
 
 class CalcButton(ft.ElevatedButton):
@@ -41,110 +42,15 @@ class ScientificButton(CalcButton):
 def main(page: ft.Page):
     page.title = "Scientific Calculator"
 
-    current_value = "0"
-    stored_value = None
-    current_operator = None
-    new_input = True
-    is_scientific = False
+    calculator = Calculator()
 
-    result = ft.Text(value=current_value, color=ft.Colors.WHITE, size=32)
+    result = ft.Text(value=calculator.current, color=ft.Colors.WHITE, size=32)
 
     sci_rows = ft.Column(visible=False)
 
-    def safe_calc(func):
-        nonlocal current_value, new_input
-        try:
-            current_value = str(func(float(current_value)))
-            new_input = True
-        except:
-            current_value = "Error"
-            new_input = True
-
     def on_button_click(e):
-        nonlocal current_value, stored_value, current_operator, new_input, is_scientific
-
-        t = e.control.text
-
-        # 数字
-        if t in "0123456789.":
-            if new_input:
-                current_value = ""
-                new_input = False
-            if t == "." and "." in current_value:
-                return
-            current_value += t
-
-        # AC
-        elif t == "AC":
-            current_value = "0"
-            stored_value = None
-            current_operator = None
-            new_input = True
-
-        # 符号反転
-        elif t == "+/-":
-            safe_calc(lambda x: -x)
-
-        # %
-        elif t == "%":
-            safe_calc(lambda x: x / 100)
-
-        # 演算子
-        elif t in "+-*/":
-            stored_value = float(current_value)
-            current_operator = t
-            new_input = True
-
-        # =
-        elif t == "=" and current_operator:
-            try:
-                new_value = float(current_value)
-                if current_operator == "+":
-                    current_value = str(stored_value + new_value)
-                elif current_operator == "-":
-                    current_value = str(stored_value - new_value)
-                elif current_operator == "*":
-                    current_value = str(stored_value * new_value)
-                elif current_operator == "/":
-                    current_value = str(stored_value / new_value)
-            except:
-                current_value = "Error"
-
-            current_operator = None
-            new_input = True
-
-        # SCI モード切替
-        elif t == "SCI":
-            is_scientific = not is_scientific
-            sci_rows.visible = is_scientific
-
-        # 科学計算
-        elif t == "√":
-            safe_calc(math.sqrt)
-
-        elif t == "x²":
-            safe_calc(lambda x: x ** 2)
-
-        elif t == "sin":
-            safe_calc(lambda x: math.sin(math.radians(x)))
-
-        elif t == "cos":
-            safe_calc(lambda x: math.cos(math.radians(x)))
-
-        elif t == "tan":
-            safe_calc(lambda x: math.tan(math.radians(x)))
-
-        elif t == "log":
-            safe_calc(math.log10)
-
-        elif t == "ln":
-            safe_calc(math.log)
-
-        elif t == "π":
-            current_value = str(math.pi)
-            new_input = True
-
-        result.value = current_value
+        result.value = calculator.press(e.control.text)
+        sci_rows.visible = calculator.scientific
         page.update()
 
     sci_rows.controls = [
@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import main
+from http_cache import HttpCache
+from shared_cache import SharedCache
+
+# 気象庁 API のスタブは lecture-6 のものを使う
+# （後ろに足すので、http_cache などは lecture-5 のものが先に見つかる）
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lecture-6"))
+from stub_server import AREA_PATH, FORECAST_PATH, start_stub_server  # noqa: E402
+
+# -------------------------
+# WEB_BROWSER モードで N セッションが同時に開いたときの上流アクセス
+#   1セッション = 地域一覧の更新 + 都道府県を1つ選ぶ（人気のある数エリアに集中）
+#   before: セッションごとにディスクキャッシュ経由で取得（これまでの main.py）
+#   shared: プロセス共通の SharedCache 経由（同時取得は1回にまとまる）
+# -------------------------
+HOT_AREAS = ["130000", "270000", "230000", "400000", "016000"]
+
+
+def use_stub(base_url, tmpdir, sessions):
+    main.AREA_URL = base_url + AREA_PATH
+    main.FORECAST_URL = base_url + FORECAST_PATH + "{}.json"
+    main.AREA_INDEX_PATH = os.path.join(tmpdir, "area_index.json")
+    main.http_cache = HttpCache(os.path.join(tmpdir, "cache"))
+    main.shared_cache = SharedCache()
+    main.session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=sessions)
+    main.session.mount("http://", adapter)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_sessions(n, shared):
+    hierarchy = main.get_area_hierarchy if shared else main.build_area_hierarchy
+    forecast = main.get_forecast_rows if shared else main.build_forecast_rows
+    barrier = threading.Barrier(n)
+
+    def session(i):
+        barrier.wait()
+        start = time.perf_counter()
+        hierarchy()
+        forecast(HOT_AREAS[i % len(HOT_AREAS)])
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(session, range(n)))
+
+
+def bench_sessions(n=100, delay=0.2, waves=3):
+    print(f"== {n} concurrent sessions x {waves} waves "
+          f"({len(HOT_AREAS)} areas, stub delay {delay * 1000:.0f} ms) ==")
+
+    for label, shared in (("before (per session)", False), ("shared + coalescing", True)):
+        server, base_url = start_stub_server(delay=delay)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            use_stub(base_url, tmpdir, n)
+            # 1波目はキャッシュが空の状態（起動直後 / TTL 切れ直後）
+            for wave in range(waves):
+                calls_before = server.calls
+                latencies = run_sessions(n, shared)
+                print(f"{label:<22} wave {wave + 1}: upstream calls "
+                      f"{server.calls - calls_before:4d}, "
+                      f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms, "
+                      f"p95 {percentile(latencies, 0.95) * 1000:7.1f} ms")
+            if shared:
+                print(f"  {main.shared_cache.stats()}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    bench_sessions()
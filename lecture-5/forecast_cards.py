@@ -0,0 +1,112 @@
+import flet as ft
+from datetime import datetime
+
+
+# -------------------------
+# 天気文 正規化
+# -------------------------
+def normalize_weather(text):
+    return (
+        text.replace("　", "")
+            .replace("時々", "、時々")
+            .replace("所により", "、所により")
+            .replace("後", "のち")
+    )
+
+
+# -------------------------
+# 天気 → アイコン
+# -------------------------
+def weather_icon(text):
+    if "雪" in text:
+        return "❄️"
+    if "雷" in text:
+        return "⛈"
+    if "雨" in text:
+        return "🌧"
+    if "くもり" in text or "曇" in text:
+        return "☁️"
+    if "晴" in text:
+        return "☀️"
+    return "🌈"
+
+
+# -------------------------
+# 予報カード（作るのは最初の1回だけ、あとは文字を差し替える）
+#   Flet は前回送った値と比べて変わったプロパティだけ送るので、
+#   同じ Text を使い回せば都道府県を切り替えても差分は小さく済む
+# -------------------------
+class ForecastCard(ft.Container):
+    def __init__(self):
+        super().__init__(
+            width=150,
+            padding=16,
+            bgcolor="#1E1E1E",
+            border_radius=14,
+            shadow=ft.BoxShadow(
+                blur_radius=10,
+                spread_radius=1,
+                color="#000000AA",
+            ),
+        )
+        self.date_text = ft.Text(weight="bold", color="#BBBBBB")
+        self.icon_text = ft.Text(size=44)
+        self.weather_text = ft.Text(size=11, text_align="center", color="#DDDDDD")
+        self.low_text = ft.Text(color="#64B5F6")
+        self.high_text = ft.Text(color="#EF9A9A")
+        self.content = ft.Column(
+            [
+                self.date_text,
+                self.icon_text,
+                self.weather_text,
+                ft.Row(
+                    [self.low_text, ft.Text("/", color="#888888"), self.high_text],
+                    alignment="center",
+                ),
+            ],
+            horizontal_alignment="center",
+            spacing=6,
+        )
+
+    # row: (timeDefine, 気象庁の天気文, 最低, 最高)
+    def set_row(self, row):
+        d, raw, low, high = row
+        self.date_text.value = datetime.fromisoformat(d).strftime("%m/%d")
+        self.icon_text.value = weather_icon(raw)
+        self.weather_text.value = normalize_weather(raw)
+        self.low_text.value = f"{low}℃"
+        self.high_text.value = f"{high}℃"
+        self.visible = True
+
+
+# -------------------------
+# カードの入れ物（足りない分だけ作り、余った分は隠す）
+# -------------------------
+class CardPool(ft.Row):
+    def __init__(self, **kwargs):
+        super().__init__(wrap=True, spacing=16, **kwargs)
+
+    def show(self, rows):
+        for i, row in enumerate(rows):
+            if i == len(self.controls):
+                self.controls.append(ForecastCard())
+            self.controls[i].set_row(row)
+        for card in self.controls[len(rows):]:
+            card.visible = False
+
+
+# -------------------------
+# 予報の表示欄（見出し + カード）
+# -------------------------
+class ForecastPanel(ft.Column):
+    def __init__(self, **kwargs):
+        super().__init__(spacing=20, scroll=ft.ScrollMode.AUTO, **kwargs)
+        self.title = ft.Text(size=26, weight="bold", visible=False)
+        self.cards = CardPool()
+        self.controls = [self.title, self.cards]
+
+    def show_list(self, pref, rows):
+        self.title.value = f"{pref} の天気予報"
+        self.title.visible = True
+        self.cards.show(rows)
+        self.update()
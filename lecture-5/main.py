@@ -1,16 +1,38 @@
+import json
+import os
+import threading
+
 import flet as ft
 import requests
-from datetime import datetime
+
+from forecast_cards import ForecastPanel
+from http_cache import HttpCache
+from shared_cache import SharedCache
 
 AREA_URL = "https://www.jma.go.jp/bosai/common/const/area.json"
 FORECAST_URL = "https://www.jma.go.jp/bosai/forecast/data/forecast/{}.json"
 
+AREA_INDEX_PATH = "area_index.json"
+
+AREA_TTL = 24 * 60 * 60
+FORECAST_TTL = 600
+
+session = requests.Session()
+http_cache = HttpCache()
+# 全セッション共通（shared_cache.py）。ディスクのキャッシュより手前で、
+# 同じ URL の同時取得を1回にまとめる
+shared_cache = SharedCache()
+
 
 # -------------------------
 # 地方 → 都道府県 階層取得
 # -------------------------
 def get_area_hierarchy():
-    res = requests.get(AREA_URL, timeout=5).json()
+    return shared_cache.get("area", build_area_hierarchy, ttl=AREA_TTL)
+
+
+def build_area_hierarchy():
+    res = http_cache.get_json(AREA_URL, ttl=AREA_TTL, session=session)
     centers = res["centers"]
     offices = res["offices"]
 
@@ -32,36 +54,63 @@ def get_area_hierarchy():
             if region in hierarchy:
                 hierarchy[region][info["name"]] = code
 
+    save_area_index(hierarchy)
     return hierarchy
 
 
 # -------------------------
-# 天気文 正規化
+# 階層の索引ファイル（起動時はこれを読むだけ）
 # -------------------------
-def normalize_weather(text):
-    return (
-        text.replace("　", "")
-            .replace("時々", "、時々")
-            .replace("所により", "、所により")
-            .replace("後", "のち")
-    )
+def save_area_index(hierarchy):
+    # セッションごとのスレッドから同時に呼ばれても壊れないよう一時ファイルは別名
+    tmp = f"{AREA_INDEX_PATH}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(hierarchy, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, AREA_INDEX_PATH)
+
+
+def load_area_hierarchy():
+    try:
+        with open(AREA_INDEX_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return get_area_hierarchy()
+
+
+# 都道府県名 → コード
+def build_code_index(hierarchy):
+    return {
+        name: code
+        for prefs in hierarchy.values()
+        for name, code in prefs.items()
+    }
 
 
 # -------------------------
-# 天気 → アイコン
+# 予報（先頭5日分の (date, weather, low, high)）
 # -------------------------
-def weather_icon(text):
-    if "雪" in text:
-        return "❄️"
-    if "雷" in text:
-        return "⛈"
-    if "雨" in text:
-        return "🌧"
-    if "くもり" in text or "曇" in text:
-        return "☁️"
-    if "晴" in text:
-        return "☀️"
-    return "🌈"
+def get_forecast_rows(code):
+    return shared_cache.get(
+        ("forecast", code), lambda: build_forecast_rows(code), ttl=FORECAST_TTL
+    )
+
+
+def build_forecast_rows(code):
+    res = http_cache.get_json(
+        FORECAST_URL.format(code), ttl=FORECAST_TTL, session=session
+    )
+    short = res[0]["timeSeries"][0]
+    temps = res[0]["timeSeries"][2]["areas"][0]["temps"]
+
+    dates = short["timeDefines"]
+    weathers = short["areas"][0]["weathers"]
+
+    rows = []
+    for i in range(min(5, len(dates))):
+        low = temps[i * 2] if i * 2 < len(temps) else "-"
+        high = temps[i * 2 + 1] if i * 2 + 1 < len(temps) else "-"
+        rows.append((dates[i], weathers[i], low, high))
+    return rows
 
 
 # -------------------------
@@ -72,13 +121,11 @@ def main(page: ft.Page):
     page.theme_mode = ft.ThemeMode.DARK
     page.bgcolor = "#121212"
 
-    hierarchy = get_area_hierarchy()
+    hierarchy = load_area_hierarchy()
+    code_of = build_code_index(hierarchy)
 
-    content_area = ft.Column(
-        expand=True,
-        spacing=20,
-        scroll=ft.ScrollMode.AUTO,
-    )
+    # カードは作り直さず、値だけ差し替える（forecast_cards.py）
+    content_area = ForecastPanel(expand=True)
 
     # -------- 地方変更 --------
     def on_region_change(e):
@@ -92,71 +139,10 @@ def main(page: ft.Page):
 
     # -------- 都道府県変更 --------
     def on_pref_change(e):
-        region = region_dd.value
         pref = pref_dd.value
-        code = hierarchy[region][pref]
-
-        res = requests.get(FORECAST_URL.format(code)).json()
-        short = res[0]["timeSeries"][0]
-        temps = res[0]["timeSeries"][2]["areas"][0]["temps"]
+        code = code_of[pref]
 
-        dates = short["timeDefines"]
-        weathers = short["areas"][0]["weathers"]
-
-        content_area.controls.clear()
-        content_area.controls.append(
-            ft.Text(f"{pref} の天気予報", size=26, weight="bold")
-        )
-
-        cards = ft.Row(wrap=True, spacing=16)
-
-        for i in range(min(5, len(dates))):
-            date = datetime.fromisoformat(dates[i]).strftime("%m/%d")
-            raw = weathers[i]
-            weather = normalize_weather(raw)
-            icon = weather_icon(raw)
-
-            low = temps[i * 2] if i * 2 < len(temps) else "-"
-            high = temps[i * 2 + 1] if i * 2 + 1 < len(temps) else "-"
-
-            cards.controls.append(
-                ft.Container(
-                    width=150,
-                    padding=16,
-                    bgcolor="#1E1E1E",
-                    border_radius=14,
-                    shadow=ft.BoxShadow(
-                        blur_radius=10,
-                        spread_radius=1,
-                        color="#000000AA",
-                    ),
-                    content=ft.Column(
-                        [
-                            ft.Text(date, weight="bold", color="#BBBBBB"),
-                            ft.Text(icon, size=44),
-                            ft.Text(
-                                weather,
-                                size=11,
-                                text_align="center",
-                                color="#DDDDDD",
-                            ),
-                            ft.Row(
-                                [
-                                    ft.Text(f"{low}℃", color="#64B5F6"),
-                                    ft.Text("/", color="#888888"),
-                                    ft.Text(f"{high}℃", color="#EF9A9A"),
-                                ],
-                                alignment="center",
-                            ),
-                        ],
-                        horizontal_alignment="center",
-                        spacing=6,
-                    ),
-                )
-            )
-
-        content_area.controls.append(cards)
-        page.update()
+        content_area.show_list(pref, get_forecast_rows(code))
 
     # -------- UI --------
     region_dd = ft.Dropdown(
@@ -217,6 +203,25 @@ def main(page: ft.Page):
         )
     )
 
+    # -------- 地域一覧の裏更新 --------
+    def refresh_hierarchy():
+        nonlocal hierarchy, code_of
+        try:
+            latest = get_area_hierarchy()
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print("地域一覧の更新に失敗:", e)
+            return
+
+        if latest != hierarchy:
+            hierarchy = latest
+            code_of = build_code_index(hierarchy)
+            region_dd.options = [
+                ft.dropdown.Option(r) for r in hierarchy.keys()
+            ]
+            page.update()
+
+    threading.Thread(target=refresh_hierarchy, daemon=True).start()
+
 
 if __name__ == "__main__":
     ft.app(target=main, view=ft.AppView.WEB_BROWSER)
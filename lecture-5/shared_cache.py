@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------
+# プロセス全体で共有するメモリキャッシュ
+#   WEB_BROWSER モードではブラウザのセッションごとに main(page) が動くので、
+#   キャッシュはモジュールに1つだけ置いて全セッションで使う
+#   - TTL 内ならそのまま返す（返した値は全セッションで共有するので書き換えない）
+#   - 同じキーを取得中なら、後から来たスレッドは終わるのを待って同じ結果を使う
+#     → 100 セッションが同時に同じエリアを開いても上流へは1回
+#   - 失敗は覚えない（待っていたスレッドには同じ例外を投げる）
+#   - max_entries を超えたら最後に使われたのが古いものから捨てる
+# -------------------------
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key → (期限, 値)
+        self._calls = {}               # key → 取得中の _Call
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "miss": 0, "coalesced": 0, "error": 0}
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def get(self, key, load, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hit"] += 1
+                return entry[1]
+
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = _Call()
+                self._stats["miss"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        # 他のスレッドが取得中 → 終わるのを待って、その結果を使う
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = load()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None:
+                    self._entries[key] = (time.monotonic() + ttl, call.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                else:
+                    self._stats["error"] += 1
+            call.done.set()
+        return call.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
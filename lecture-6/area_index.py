@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+
+import requests
+
+from db import load_areas, save_areas
+from jma_api import fetch_area_rows
+
+
+# -------------------------
+# 地方 / 都道府県 の索引
+#   hierarchy: 地方 → {都道府県名: コード}
+#   region_of: コード → 地方
+#   code_of:   都道府県名 → コード
+#   name_of:   コード → 都道府県名
+# -------------------------
+class AreaIndex:
+    def __init__(self, rows):
+        self.rows = [tuple(r[:3]) for r in rows]
+        self.hierarchy = {}
+        self.region_of = {}
+        self.code_of = {}
+        self.name_of = {}
+
+        for code, name, region in self.rows:
+            self.hierarchy.setdefault(region, {})[name] = code
+            self.region_of[code] = region
+            self.code_of[name] = code
+            self.name_of[code] = name
+
+    def regions(self):
+        return list(self.hierarchy.keys())
+
+    def prefs(self, region):
+        return list(self.hierarchy.get(region, {}).keys())
+
+    def __eq__(self, other):
+        return isinstance(other, AreaIndex) and self.rows == other.rows
+
+
+def refresh_area_index():
+    rows = fetch_area_rows()
+    save_areas(rows)
+    return AreaIndex(rows)
+
+
+# DB に索引があればそれを返し、無いとき（初回）だけネットワークに出る
+def load_area_index():
+    rows = load_areas()
+    if rows:
+        return AreaIndex(rows)
+    return refresh_area_index()
+
+
+# 取り直した索引が変わっていたら on_change(index) を呼ぶ
+def refresh_area_index_in_background(current, on_change=None):
+    def run():
+        try:
+            index = refresh_area_index()
+        except (requests.RequestException, sqlite3.Error, ValueError, KeyError) as e:
+            print("地域一覧の更新に失敗:", e)
+            return
+        if on_change and index != current:
+            on_change(index)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
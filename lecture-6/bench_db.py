@@ -0,0 +1,221 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import db
+
+N = 10_000
+
+
+# -------------------------
+# 旧実装（1呼び出しごとに connect / commit / close）
+# -------------------------
+INSERT_OR_IGNORE = """
+    INSERT OR IGNORE INTO forecasts
+    (area_code, date, weather, temp_min, temp_max)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def save_forecast_per_call(area_code, date, weather, temp_min, temp_max):
+    conn = sqlite3.connect(db.DB_NAME)
+    cur = conn.cursor()
+    cur.execute(INSERT_OR_IGNORE, (area_code, date, weather, temp_min, temp_max))
+    conn.commit()
+    conn.close()
+
+
+def load_forecast_by_date_per_call(area_code, date):
+    conn = sqlite3.connect(db.DB_NAME)
+    cur = conn.cursor()
+    cur.execute(db.SELECT_FORECAST_BY_DATE, (area_code, date))
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+# -------------------------
+# 計測用ヘルパ
+# -------------------------
+def make_rows(n, days=500):
+    base = date(2025, 1, 1)
+    return [
+        (str(130000 + i // days), (base + timedelta(days=i % days)).isoformat(),
+         "晴れ", 5, 15)
+        for i in range(n)
+    ]
+
+
+def timed(label, func, rows):
+    start = time.perf_counter()
+    for row in rows:
+        func(*row)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  ({len(rows) / elapsed:,.0f} ops/s)")
+    return elapsed
+
+
+def fresh_db(tmpdir, name):
+    db.close_conn()
+    db.DB_NAME = os.path.join(tmpdir, name)
+    db.init_db()
+
+
+def bench_connections():
+    rows = make_rows(N)
+    keys = [(r[0], r[1]) for r in rows]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"== per-call vs pooled ({N:,} rows) ==")
+
+        fresh_db(tmpdir, "per_call.db")
+        # 旧実装と同じ条件にするためロールバックジャーナルに戻す
+        db.get_conn().execute("PRAGMA journal_mode=DELETE")
+        db.close_conn()
+        t1 = timed("insert per-call", save_forecast_per_call, rows)
+        t2 = timed("lookup per-call", load_forecast_by_date_per_call, keys)
+
+        fresh_db(tmpdir, "pooled.db")
+        t3 = timed("insert pooled", db.save_forecast, rows)
+        t4 = timed("lookup pooled", db.load_forecast_by_date, keys)
+        db.close_conn()
+
+        print(f"insert speedup: {t1 / t3:.1f}x, lookup speedup: {t2 / t4:.1f}x")
+
+
+def bench_bulk(offices=58, days=7):
+    # 全官署を1回取り込む想定: 1行ずつコミット vs 1トランザクション
+    rows = make_rows(offices * days, days=days)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"== per-row vs bulk ingest ({offices} offices x {days} days) ==")
+
+        fresh_db(tmpdir, "per_row.db")
+        t1 = timed("save_forecast x rows", db.save_forecast, rows)
+
+        fresh_db(tmpdir, "bulk.db")
+        start = time.perf_counter()
+        db.save_forecasts_bulk(rows)
+        t2 = time.perf_counter() - start
+        print(f"{'save_forecasts_bulk':<28} {t2 * 1000:9.1f} ms  (1 commit)")
+
+        print(f"bulk speedup: {t1 / t2:.1f}x")
+
+        # 同じ内容の再取り込みは何も書かない / 一部だけ変われば変わった分だけ
+        unchanged = db.save_forecasts_bulk(rows)
+        changed = [r[:2] + ("雨",) + r[3:] if i % 10 == 0 else r
+                   for i, r in enumerate(rows)]
+        print(f"re-ingest: {unchanged} rows changed (same data), "
+              f"{db.save_forecasts_bulk(changed)} rows changed (10% updated)")
+        db.close_conn()
+
+
+def bench_read_cache(areas=5, days=7, lookups=50_000, refresh_every=1000):
+    # DatePicker を同じ数エリア・数日で行き来する想定
+    # refresh_every 回ごとに全エリアを取り込み直す（10回に1回は1エリアの中身が変わる）
+    rows = make_rows(areas * days, days=days)
+    keys = [(r[0], r[1]) for r in rows]
+    rnd = random.Random(0)
+    picks = [rnd.choice(keys) for _ in range(lookups)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"== date picker lookups ({lookups:,} over {len(keys)} keys, "
+              f"re-ingest every {refresh_every}) ==")
+        fresh_db(tmpdir, "read_cache.db")
+        db.save_forecasts_bulk(rows)
+        conn = db.get_conn()
+
+        def run(check=False):
+            current = list(rows)
+            for i, key in enumerate(picks):
+                if i and i % refresh_every == 0:
+                    if i % (refresh_every * 10) == 0:
+                        current = [r[:2] + (f"雨{i}",) + r[3:] if r[0] == keys[0][0] else r
+                                   for r in current]
+                    db.save_forecasts_bulk(current)
+                row = db.load_forecast_by_date(*key)
+                if check:
+                    assert row == conn.execute(db.SELECT_FORECAST_BY_DATE, key).fetchone()
+
+        for label, max_entries in (("no cache", 0), ("lru 512", 512)):
+            db.read_cache = db.LruCache(max_entries=max_entries)
+            start = time.perf_counter()
+            run()
+            elapsed = (time.perf_counter() - start) / lookups
+            print(f"{label:<28} {elapsed * 1e6:9.2f} us/lookup  {db.read_cache_stats()}")
+
+        # 書き込みのあとに古い行を返していないか、毎回 SQL と突き合わせる
+        db.read_cache = db.LruCache()
+        run(check=True)
+        print("lru results match SQL after every re-ingest")
+        db.close_conn()
+
+
+def history_rows(n, areas=58, reports_per_date=21):
+    # 1日3回 × 7日先まで → 1つの対象日に約21回の発表がある想定
+    days = max(1, n // (areas * reports_per_date))
+    base = date(2000, 1, 1)
+    for a in range(areas):
+        area = str(10000 + a * 10000).zfill(6)
+        for d in range(days):
+            target = base + timedelta(days=d)
+            for r in range(reports_per_date):
+                issued = datetime(target.year, target.month, target.day) \
+                    - timedelta(days=7) + timedelta(hours=8 * r)
+                yield (area, target.isoformat(), issued.isoformat() + "+09:00",
+                       "晴れ", r % 10, r % 10 + 8)
+
+
+def bench_history(n=10_000_000, queries=200):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"== forecast_history ({n:,} rows) ==")
+        fresh_db(tmpdir, "history.db")
+
+        start = time.perf_counter()
+        db.save_forecasts_bulk([], history=history_rows(n))
+        count = db.get_conn().execute("SELECT COUNT(*) FROM forecast_history").fetchone()[0]
+        print(f"{'load':<28} {time.perf_counter() - start:9.1f} s  ({count:,} rows)")
+
+        areas, last = db.get_conn().execute(
+            "SELECT COUNT(DISTINCT area_code), MAX(date) FROM forecast_history"
+        ).fetchone()
+        days = (date.fromisoformat(last) - date(2000, 1, 1)).days
+        rnd = random.Random(0)
+
+        def sample():
+            area = str(10000 + rnd.randrange(areas) * 10000).zfill(6)
+            d = date(2000, 1, 1) + timedelta(days=rnd.randrange(max(1, days - 30)))
+            return area, d.isoformat(), (d + timedelta(days=30)).isoformat()
+
+        cases = (
+            ("range 30 days", lambda a, s, e: db.load_history_range(a, s, e)),
+            ("latest per date 30 days", lambda a, s, e: db.load_latest_by_date(a, s, e)),
+            ("history of one date", lambda a, s, e: db.load_date_history(a, s)),
+        )
+        for label, func in cases:
+            args = [sample() for _ in range(queries)]
+            start = time.perf_counter()
+            for a in args:
+                func(*a)
+            elapsed = (time.perf_counter() - start) / queries
+            print(f"{label:<28} {elapsed * 1000:9.3f} ms/query")
+
+        plan = db.get_conn().execute(
+            "EXPLAIN QUERY PLAN " + db.SELECT_LATEST_BY_DATE, ("x", "a", "b")
+        ).fetchall()
+        print("plan:", "; ".join(row[-1] for row in plan))
+        db.close_conn()
+
+
+if __name__ == "__main__":
+    # python bench_db.py history [行数] で履歴テーブルのみ計測
+    if sys.argv[1:2] == ["history"]:
+        bench_history(int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000)
+    else:
+        bench_connections()
+        bench_bulk()
+        bench_read_cache()
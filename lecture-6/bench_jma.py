@@ -0,0 +1,262 @@
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import jma_api
+from http_cache import HttpCache
+from area_index import load_area_index, refresh_area_index
+from forecast_loader import ForecastLoader
+from stub_server import AREA_PATH, FORECAST_PATH, start_stub_server
+
+# 全国の府県予報区（約58官署）を想定したエリアコード
+AREA_CODES = [f"{code:02d}0000" for code in range(1, 48)] + [
+    f"01{i}000" for i in range(1, 10)
+] + ["460040", "471000"]
+
+
+def use_stub(base_url):
+    jma_api.AREA_URL = base_url + AREA_PATH
+    jma_api.FORECAST_URL = base_url + FORECAST_PATH + "{}.json"
+
+
+def bench_crawl(delay=0.05, concurrency=8):
+    server, base_url = start_stub_server(delay=delay)
+    use_stub(base_url)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.close_conn()
+        db.DB_NAME = os.path.join(tmpdir, "crawl.db")
+        db.init_db()
+        # キャッシュを効かせると比較にならないので TTL 0 の使い捨てキャッシュ
+        jma_api.http_cache = HttpCache(os.path.join(tmpdir, "cache"), ttl=0)
+        jma_api.FORECAST_TTL = 0
+
+        print(f"== crawl {len(AREA_CODES)} areas (stub delay {delay * 1000:.0f} ms) ==")
+
+        start = time.perf_counter()
+        for code in AREA_CODES:
+            jma_api.fetch_and_store(code)
+        sequential = time.perf_counter() - start
+        print(f"{'sequential fetch_and_store':<32} {sequential * 1000:8.1f} ms")
+
+        start = time.perf_counter()
+        report = jma_api.fetch_and_store_many(AREA_CODES, concurrency=concurrency)
+        parallel = time.perf_counter() - start
+        print(f"{f'fetch_and_store_many (k={concurrency})':<32} {parallel * 1000:8.1f} ms")
+
+        slowest = sorted(report.items(), key=lambda kv: kv[1]["elapsed"])[-3:]
+        for code, r in reversed(slowest):
+            print(f"  {code}: {r['elapsed'] * 1000:.1f} ms, {r['rows']} rows, error={r['error']}")
+
+        print(f"speedup: {sequential / parallel:.1f}x")
+        db.close_conn()
+
+    server.shutdown()
+
+
+def bench_cache(delay=0.05, rounds=5):
+    server, base_url = start_stub_server(delay=delay)
+    use_stub(base_url)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        codes = AREA_CODES[:10]
+        session = jma_api.get_session()
+        print(f"== http cache ({len(codes)} areas x {rounds} rounds) ==")
+
+        for label, ttl in (("ttl=600 (fresh)", 600), ("ttl=0 (revalidate)", 0)):
+            cache = HttpCache(os.path.join(tmpdir, f"cache-{ttl}"))
+            calls_before = server.calls
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for code in codes:
+                    url = jma_api.FORECAST_URL.format(code)
+                    cache.get_json(url, ttl=ttl, session=session)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<20} {elapsed * 1000:8.1f} ms, upstream calls "
+                  f"{server.calls - calls_before}, stats {cache.stats()}")
+
+    server.shutdown()
+
+
+def bench_startup(delay=0.05, rounds=20):
+    # 起動時の地域一覧: area.json 取得 + 組み立て vs weather.db の索引
+    server, base_url = start_stub_server(delay=delay)
+    use_stub(base_url)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.close_conn()
+        db.DB_NAME = os.path.join(tmpdir, "startup.db")
+        db.init_db()
+        jma_api.http_cache = HttpCache(os.path.join(tmpdir, "cache"))
+        # 毎回 area.json を取りに行く（キャッシュ導入前の起動と同じ条件）
+        jma_api.AREA_TTL = -1
+
+        print(f"== startup area index (stub delay {delay * 1000:.0f} ms) ==")
+        for label, func in (("network + rebuild", refresh_area_index),
+                            ("index from weather.db", load_area_index)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                index = func()
+            elapsed = (time.perf_counter() - start) / rounds
+            print(f"{label:<24} {elapsed * 1000:8.2f} ms  ({len(index.code_of)} offices)")
+        db.close_conn()
+
+    server.shutdown()
+
+
+def bench_first_paint(delay=2.0):
+    # クリック → 最初の描画 までの時間（遅いバックエンドを想定）
+    server, base_url = start_stub_server(delay=delay)
+    use_stub(base_url)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.close_conn()
+        db.DB_NAME = os.path.join(tmpdir, "ui.db")
+        db.init_db()
+        jma_api.http_cache = HttpCache(os.path.join(tmpdir, "cache"))
+        jma_api.FORECAST_TTL = 0
+
+        a, b = "130000", "140000"
+        jma_api.fetch_and_store_many([a, b])
+
+        print(f"== click -> first paint (stub delay {delay * 1000:.0f} ms) ==")
+
+        start = time.perf_counter()
+        jma_api.fetch_and_store(a)
+        db.load_forecasts(a)
+        print(f"{'blocking handler':<24} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        async def run():
+            painted = []
+            loader = ForecastLoader(
+                lambda code, rows, fresh: painted.append(
+                    (code, fresh, time.perf_counter() - start)
+                ),
+                max_age=0,
+            )
+
+            start = time.perf_counter()
+            await loader.select(a)
+            # 更新が終わる前に別の県を選ぶ → a の更新結果は描画されない
+            await asyncio.sleep(delay / 4)
+            task = await loader.select(b)
+            await task
+            return painted
+
+        painted = asyncio.run(run())
+        print(f"{'ForecastLoader (cached)':<24} {painted[0][2] * 1000:8.3f} ms")
+        for code, fresh, t in painted:
+            print(f"  paint {code} fresh={fresh} at {t * 1000:.1f} ms")
+        db.close_conn()
+
+    server.shutdown()
+
+
+def bench_freshness(clicks=200, interval=0.01, max_age=1.0):
+    # 都道府県クリックの連続: 毎回 API vs 鮮度判定つき
+    server, base_url = start_stub_server(delay=0.005)
+    use_stub(base_url)
+    codes = AREA_CODES[:10]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.close_conn()
+        db.DB_NAME = os.path.join(tmpdir, "fresh.db")
+        db.init_db()
+        jma_api.http_cache = HttpCache(os.path.join(tmpdir, "cache"))
+        jma_api.FORECAST_TTL = 0
+
+        print(f"== upstream calls for {clicks} clicks over {len(codes)} areas "
+              f"(max_age {max_age} s) ==")
+
+        for label, func in (
+            ("fetch every click", jma_api.fetch_and_store),
+            ("refresh_if_stale", lambda c: jma_api.refresh_if_stale(c, max_age)),
+        ):
+            calls_before = server.calls
+            for i in range(clicks):
+                func(codes[i % len(codes)])
+                time.sleep(interval)
+            print(f"{label:<24} {server.calls - calls_before:5d} upstream calls")
+
+        # 同じエリアへの同時リクエストは1本にまとまる
+        calls_before = server.calls
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda _: jma_api.refresh_if_stale("150000", max_age), range(16)))
+        print(f"{'16 concurrent, 1 area':<24} {server.calls - calls_before:5d} upstream calls")
+        db.close_conn()
+
+    server.shutdown()
+
+
+def bench_region(delay=0.3, think=0.5, rounds=200):
+    # 地方を選ぶ → 少し眺めてから都道府県を順にクリック したときの
+    # クリック → 最新の予報が描けるまで の時間
+    server, base_url = start_stub_server(delay=delay)
+    use_stub(base_url)
+    codes = AREA_CODES[:8]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"== region prefetch ({len(codes)} areas, stub delay {delay * 1000:.0f} ms, "
+              f"think {think * 1000:.0f} ms) ==")
+
+        async def clicks(prefetch):
+            fresh_at = {}
+            loader = ForecastLoader(
+                lambda code, rows, fresh: fresh and fresh_at.setdefault(
+                    code, time.perf_counter()
+                ),
+                max_age=60,
+            )
+            if prefetch:
+                await loader.select_region(codes)
+            await asyncio.sleep(think)
+
+            latencies = []
+            for code in codes:
+                start = time.perf_counter()
+                task = await loader.select(code)
+                if task:
+                    await task
+                latencies.append(fresh_at[code] - start)
+            return latencies
+
+        for label, prefetch in (("per-pref refresh", False), ("region prefetch", True)):
+            db.close_conn()
+            db.DB_NAME = os.path.join(tmpdir, f"region-{prefetch}.db")
+            db.init_db()
+            jma_api.http_cache = HttpCache(os.path.join(tmpdir, f"cache-{prefetch}"))
+            jma_api.FORECAST_TTL = 0
+
+            calls_before = server.calls
+            latencies = asyncio.run(clicks(prefetch))
+            print(f"{label:<20} mean {sum(latencies) / len(latencies) * 1000:8.1f} ms, "
+                  f"max {max(latencies) * 1000:8.1f} ms, "
+                  f"upstream calls {server.calls - calls_before}")
+
+        # 地方の読み込み: エリアごとに SELECT vs 1回の SELECT
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for code in codes:
+                db.load_forecasts(code)
+        one_by_one = (time.perf_counter() - start) / rounds
+        start = time.perf_counter()
+        for _ in range(rounds):
+            db.load_forecasts_many(codes)
+        batched = (time.perf_counter() - start) / rounds
+        print(f"{f'{len(codes)} x load_forecasts':<20} {one_by_one * 1000:8.3f} ms")
+        print(f"{'load_forecasts_many':<20} {batched * 1000:8.3f} ms")
+        db.close_conn()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    bench_crawl()
+    bench_cache()
+    bench_startup()
+    bench_first_paint()
+    bench_freshness()
+    bench_region()
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+import db
+import jma_api
+from area_index import refresh_area_index
+from bench_jma import AREA_CODES, use_stub
+from http_cache import HttpCache
+from service import ForecastService
+from stub_server import start_stub_server
+
+
+# -------------------------
+# service.py の負荷試験
+#   サービスは別プロセスで動かし、このプロセスから keep-alive の接続を
+#   connections 本張って、各接続で順にリクエストを送る
+#   リクエストの内訳: /areas 10% / /forecast/{code} 60% / /forecast/{code}/{date} 30%
+# -------------------------
+def make_db(path):
+    server, base_url = start_stub_server()
+    use_stub(base_url)
+    db.close_conn()
+    db.DB_NAME = path
+    db.init_db()
+    jma_api.http_cache = HttpCache(os.path.join(os.path.dirname(path), "cache"))
+    refresh_area_index()
+    jma_api.fetch_and_store_many(AREA_CODES)
+    dates = [row[0] for row in db.load_forecasts(AREA_CODES[0])]
+    db.close_conn()
+    server.shutdown()
+    return dates
+
+
+def run_service(db_path, max_entries, ready):
+    db.DB_NAME = db_path
+
+    async def main():
+        service = ForecastService(refresh_interval=None, max_entries=max_entries)
+        server = await service.start(port=0)
+        ready.put(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def make_paths(dates, n, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(n):
+        r = rng.random()
+        code = rng.choice(AREA_CODES)
+        if r < 0.1:
+            paths.append("/areas")
+        elif r < 0.7:
+            paths.append(f"/forecast/{code}")
+        else:
+            paths.append(f"/forecast/{code}/{rng.choice(dates)}")
+    return paths
+
+
+async def client(port, paths, gzip, latencies, sizes):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    accept = "Accept-Encoding: gzip\r\n" if gzip else ""
+    for path in paths:
+        start = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n{accept}\r\n".encode())
+        await writer.drain()
+
+        status = await reader.readline()
+        length = 0
+        while True:
+            header = await reader.readline()
+            if header == b"\r\n":
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        body = await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        sizes.append(len(body))
+        assert status.startswith(b"HTTP/1.1 200"), (path, status)
+    writer.close()
+
+
+def load(port, paths, connections, gzip):
+    latencies = []
+    sizes = []
+
+    async def main():
+        per_conn = len(paths) // connections
+        await asyncio.gather(*[
+            client(port, paths[i * per_conn:(i + 1) * per_conn], gzip, latencies, sizes)
+            for i in range(connections)
+        ])
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, sorted(latencies), sum(sizes) / len(sizes)
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def bench_service(requests_total=20000, connections=32):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "service.db")
+        dates = make_db(db_path)
+        paths = make_paths(dates, requests_total)
+
+        print(f"== service load ({requests_total} requests, {connections} connections) ==")
+        for label, max_entries, gzip in (
+            ("no cache", 0, False),
+            ("cached", 4096, False),
+            ("cached + gzip", 4096, True),
+        ):
+            ready = multiprocessing.Queue()
+            proc = multiprocessing.Process(
+                target=run_service, args=(db_path, max_entries, ready), daemon=True
+            )
+            proc.start()
+            port = ready.get(timeout=10)
+
+            # 1回流して温めてから測る
+            load(port, paths[:2000], connections, gzip)
+            rps, latencies, size = load(port, paths, connections, gzip)
+            print(f"{label:<14} {rps:8.0f} req/s, "
+                  f"p50 {percentile(latencies, 0.5) * 1000:6.2f} ms, "
+                  f"p95 {percentile(latencies, 0.95) * 1000:6.2f} ms, "
+                  f"p99 {percentile(latencies, 0.99) * 1000:6.2f} ms, "
+                  f"avg body {size:7.0f} B")
+            proc.terminate()
+            proc.join()
+
+
+if __name__ == "__main__":
+    bench_service()
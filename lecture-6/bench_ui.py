@@ -0,0 +1,131 @@
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import ClientActions, ClientMessage, CommandEncoder
+
+from forecast_cards import ForecastPanel, weather_icon
+
+WEATHERS = ["晴れ", "くもり", "雨", "晴れ 時々 くもり", "くもり 後 雨", "雪", "雷雨"]
+
+
+# -------------------------
+# 送る代わりに大きさを数えるだけの接続
+#   コマンドの処理は Flet の LocalConnection そのまま（ID の払い出しも同じ）
+# -------------------------
+class RecordingConnection(LocalConnection):
+    def __init__(self):
+        super().__init__()
+        self.sent_bytes = 0
+        self.messages = 0
+
+    def send_commands(self, session_id, commands):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            j = json.dumps(
+                ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages),
+                cls=CommandEncoder, separators=(",", ":"),
+            )
+            self.sent_bytes += len(j.encode("utf-8"))
+            self.messages += len(messages)
+        return type("Response", (), {"results": results})()
+
+
+def make_page():
+    conn = RecordingConnection()
+    page = ft.Page(conn, "bench", asyncio.new_event_loop())
+    return page, conn
+
+
+def make_rows(n_prefs=47, days=7, seed=0):
+    rnd = random.Random(seed)
+    start = date(2026, 1, 1)
+    return [
+        (f"県{i:02d}", [
+            ((start + timedelta(days=d)).isoformat(), rnd.choice(WEATHERS),
+             rnd.randint(-5, 15), rnd.randint(5, 30))
+            for d in range(rnd.randint(days - 2, days))
+        ])
+        for i in range(n_prefs)
+    ]
+
+
+# -------------------------
+# 以前の描画（毎回 clear して全部作り直す）
+# -------------------------
+def old_show_forecast_list(page, content_area, pref, rows, loading=False):
+    content_area.controls.clear()
+    content_area.controls.append(ft.Text(f"{pref} の天気予報", size=26, weight="bold"))
+    if loading:
+        content_area.controls.append(ft.Text("最新の予報を取得中…", size=12, color="#888888"))
+
+    cards = ft.Row(wrap=True, spacing=16)
+    for d, weather, low, high in rows:
+        cards.controls.append(
+            ft.Container(
+                width=150, padding=16, bgcolor="#1E1E1E", border_radius=14,
+                content=ft.Column(
+                    [
+                        ft.Text(date.fromisoformat(d).strftime("%m/%d"), weight="bold"),
+                        ft.Text(weather_icon(weather), size=44),
+                        ft.Text(weather, size=11, text_align="center"),
+                        ft.Text(f"{low}/{high}℃"),
+                    ],
+                    horizontal_alignment="center", spacing=6,
+                ),
+            )
+        )
+    content_area.controls.append(cards)
+    page.update()
+
+
+def run(label, render, switches):
+    page, conn = make_page()
+    content_area = ForecastPanel() if label == "pool" else ft.Column(spacing=20)
+    page.add(content_area)
+
+    prefs = make_rows()
+    render(page, content_area, *prefs[0])  # 初回表示は数えない
+    conn.sent_bytes = conn.messages = 0
+
+    times = []
+    for i in range(switches):
+        pref, rows = prefs[(i + 1) % len(prefs)]
+        start = time.perf_counter()
+        # DB の内容 → 最新の予報、の2回描画（on_pref_change と同じ）
+        render(page, content_area, pref, rows, True)
+        render(page, content_area, pref, rows, False)
+        times.append(time.perf_counter() - start)
+
+    times.sort()
+    print(f"{label:<8} {conn.sent_bytes / switches:9,.0f} B/switch "
+          f"{conn.messages / switches:6.1f} msgs/switch  "
+          f"median {times[len(times) // 2] * 1000:6.2f} ms  "
+          f"p95 {times[int(len(times) * 0.95)] * 1000:6.2f} ms  "
+          f"(controls in index: {len(page.index)})")
+
+
+def pool_render(page, panel, pref, rows, loading=False):
+    panel.show_list(pref, rows, loading)
+
+
+def bench_ui(switches=500):
+    print(f"== {switches} prefecture switches (loading + fresh paint each) ==")
+    run("rebuild", old_show_forecast_list, switches)
+    run("pool", pool_render, switches)
+
+
+if __name__ == "__main__":
+    bench_ui(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -1,13 +1,179 @@
+import json
 import sqlite3
+import threading
+import time
+
+from read_cache import LruCache
 
 DB_NAME = "weather.db"
 
+# -------------------------
+# 接続管理（スレッドごとに1本を使い回す）
+# -------------------------
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
+
+_local = threading.local()
+
+
+def get_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.db_name == DB_NAME:
+        return conn
+
+    close_conn()
+    # cached_statements: 同じ SQL 文字列はコンパイル済みのものを再利用する
+    conn = sqlite3.connect(DB_NAME, cached_statements=128)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+    _local.conn = conn
+    _local.db_name = DB_NAME
+    _local.data_version = None
+    return conn
+
+
+def close_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+# -------------------------
+# SQL
+# -------------------------
+# 同じ (area_code, date) があれば上書き。ただし中身が変わったときだけ書く
+UPSERT_FORECAST = """
+    INSERT INTO forecasts
+    (area_code, date, weather, temp_min, temp_max)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(area_code, date) DO UPDATE SET
+        weather = excluded.weather,
+        temp_min = excluded.temp_min,
+        temp_max = excluded.temp_max
+    WHERE weather IS NOT excluded.weather
+        OR temp_min IS NOT excluded.temp_min
+        OR temp_max IS NOT excluded.temp_max
+"""
+
+SELECT_FORECASTS = """
+    SELECT date, weather, temp_min, temp_max
+    FROM forecasts
+    WHERE area_code = ?
+    ORDER BY date
+    LIMIT 5
+"""
+
+# 複数エリアをまとめて（エリアごとに先頭5日）。コードの一覧は JSON 配列1つで渡す
+SELECT_FORECASTS_MANY = """
+    SELECT f.area_code, f.date, f.weather, f.temp_min, f.temp_max
+    FROM json_each(?) AS j
+    JOIN forecasts AS f ON f.area_code = j.value
+    WHERE f.date IN (
+        SELECT date FROM forecasts WHERE area_code = j.value ORDER BY date LIMIT 5
+    )
+    ORDER BY f.area_code, f.date
+"""
+
+UPSERT_REFRESH = """
+    INSERT INTO area_refresh (area_code, fetched_at)
+    VALUES (?, ?)
+    ON CONFLICT(area_code) DO UPDATE SET fetched_at = excluded.fetched_at
+"""
+
+SELECT_REFRESH = """
+    SELECT fetched_at
+    FROM area_refresh
+    WHERE area_code = ?
+"""
+
+SELECT_REFRESH_MANY = """
+    SELECT area_code, fetched_at
+    FROM area_refresh
+    WHERE area_code IN (SELECT value FROM json_each(?))
+"""
+
+# 発表ごとの履歴。同じ発表を取り直しても重複しない
+INSERT_HISTORY = """
+    INSERT OR IGNORE INTO forecast_history
+    (area_code, date, report_datetime, weather, temp_min, temp_max)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_ELEMENT = """
+    INSERT OR IGNORE INTO forecast_elements
+    (office_code, report_datetime, term, sub_area, time_define, element, value)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_ELEMENTS = """
+    SELECT sub_area, time_define, value
+    FROM forecast_elements
+    WHERE office_code = ?
+    AND report_datetime = (
+        SELECT MAX(report_datetime) FROM forecast_elements
+        WHERE office_code = ? AND term = ?
+    )
+    AND term = ?
+    AND element = ?
+    ORDER BY sub_area, time_define
+"""
+
+SELECT_HISTORY_RANGE = """
+    SELECT date, report_datetime, weather, temp_min, temp_max
+    FROM forecast_history
+    WHERE area_code = ?
+    AND date BETWEEN ? AND ?
+    ORDER BY date, report_datetime
+"""
+
+# SQLite では MAX() と一緒に選んだ列は MAX の行の値になる
+SELECT_LATEST_BY_DATE = """
+    SELECT date, MAX(report_datetime), weather, temp_min, temp_max
+    FROM forecast_history
+    WHERE area_code = ?
+    AND date BETWEEN ? AND ?
+    GROUP BY date
+    ORDER BY date
+"""
+
+SELECT_DATE_HISTORY = """
+    SELECT report_datetime, weather, temp_min, temp_max
+    FROM forecast_history
+    WHERE area_code = ?
+    AND date = ?
+    ORDER BY report_datetime
+"""
+
+INSERT_AREA = """
+    INSERT INTO areas (code, name, region, sort_order)
+    VALUES (?, ?, ?, ?)
+"""
+
+SELECT_AREAS = """
+    SELECT code, name, region
+    FROM areas
+    ORDER BY sort_order
+"""
+
+SELECT_FORECAST_BY_DATE = """
+    SELECT date, weather, temp_min, temp_max
+    FROM forecasts
+    WHERE area_code = ?
+    AND date = ?
+"""
+
 
 def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
+    conn = get_conn()
 
-    cur.execute("""
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS forecasts (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         area_code TEXT,
@@ -19,50 +185,232 @@ def init_db():
     )
     """)
 
+    # 予報の履歴（精度分析用）
+    # WITHOUT ROWID なので主キー順にそのまま並び、主キーがそのまま
+    # 全列を含むカバリングインデックスになる（エリア・日付の範囲検索向け）
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS forecast_history (
+        area_code TEXT NOT NULL,
+        date TEXT NOT NULL,
+        report_datetime TEXT NOT NULL,
+        weather TEXT,
+        temp_min INTEGER,
+        temp_max INTEGER,
+        PRIMARY KEY (area_code, date, report_datetime)
+    ) WITHOUT ROWID
+    """)
+
+    # 予報 JSON の全系列（降水確率・風・週間予報など）
+    # value は系列によって数値または文字列
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS forecast_elements (
+        office_code TEXT NOT NULL,
+        report_datetime TEXT NOT NULL,
+        term TEXT NOT NULL,
+        sub_area TEXT NOT NULL,
+        time_define TEXT NOT NULL,
+        element TEXT NOT NULL,
+        value,
+        PRIMARY KEY (office_code, term, report_datetime, element, sub_area, time_define)
+    ) WITHOUT ROWID
+    """)
+
+    # エリアごとの最終取得時刻（鮮度の判定に使う）
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS area_refresh (
+        area_code TEXT PRIMARY KEY,
+        fetched_at REAL
+    )
+    """)
+
+    # 地方 → 都道府県 の索引（area.json から作ったものを保存しておく）
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS areas (
+        code TEXT PRIMARY KEY,
+        name TEXT,
+        region TEXT,
+        sort_order INTEGER
+    )
+    """)
+
+    # エリアごとの書き込み世代（読み込みキャッシュの捨て判定に使う）
+    # forecasts の行が変わるとトリガーで +1 するので、どの接続・どのプロセスの
+    # 書き込みでも数が進む
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS forecast_versions (
+        area_code TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+    for name, event, row in (
+        ("insert", "INSERT", "NEW"),
+        ("update", "UPDATE", "NEW"),
+        ("move", "UPDATE", "OLD"),    # area_code を書き換えたときは元のエリアも進める
+        ("delete", "DELETE", "OLD"),
+    ):
+        when = "WHEN OLD.area_code IS NOT NEW.area_code" if name == "move" else ""
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS forecasts_version_{name}
+        AFTER {event} ON forecasts {when}
+        BEGIN
+            INSERT INTO forecast_versions (area_code)
+            SELECT {row}.area_code
+            WHERE NOT EXISTS (
+                SELECT 1 FROM forecast_versions WHERE area_code = {row}.area_code
+            );
+            UPDATE forecast_versions SET version = version + 1
+            WHERE area_code = {row}.area_code;
+        END
+        """)
+
     conn.commit()
-    conn.close()
 
 
+# -------------------------
+# 予報の読み込みキャッシュ（read_cache.py）
+#   load_forecasts / load_forecast_by_date の結果を (DB, area_code[, date]) で覚える
+#   forecast_versions の世代が進んだエリアの分だけ捨てる
+#   - この接続の書き込み: 行が変わったときにコミット後すぐ世代を見る
+#   - 別の接続（別スレッド・別プロセスの service.py や Flet アプリ）の書き込み:
+#     PRAGMA data_version が変わったときだけ世代を見る（変わらなければ SQL は1本だけ）
+# -------------------------
+read_cache = LruCache(max_entries=512)
+
+
+def read_cache_stats():
+    return read_cache.stats()
+
+
+def _sync_versions(conn):
+    read_cache.sync(DB_NAME, dict(conn.execute("SELECT area_code, version FROM forecast_versions")))
+
+
+# data_version はこの接続以外がコミットすると変わる（この接続自身の書き込みでは変わらない）
+# 同じプロセスの別スレッドの書き込みはそのスレッドが世代を合わせ済みなので、ここでは何も捨てない
+def _check_other_writes(conn):
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if _local.data_version != version:
+        _local.data_version = version
+        _sync_versions(conn)
+
+
+# 戻り値: 追加・更新された行数（変化がなければ 0）
 def save_forecast(area_code, date, weather, temp_min, temp_max):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
+    conn = get_conn()
 
-    cur.execute("""
-        INSERT OR IGNORE INTO forecasts
-        (area_code, date, weather, temp_min, temp_max)
-        VALUES (?, ?, ?, ?, ?)
-    """, (area_code, date, weather, temp_min, temp_max))
+    with conn:
+        cur = conn.execute(
+            UPSERT_FORECAST,
+            (area_code, date, weather, temp_min, temp_max),
+        )
+    if cur.rowcount:
+        _sync_versions(conn)
+    return cur.rowcount
 
-    conn.commit()
-    conn.close()
+
+# rows: (area_code, date, weather, temp_min, temp_max) の iterable
+# refreshed: 取得できたエリアコード（最終取得時刻を同じトランザクションで更新）
+# history: (area_code, date, report_datetime, weather, temp_min, temp_max)
+# elements: jma_parser.ForecastRecord の iterable
+# 何件あっても 1トランザクション・1コミットで書き込む
+# 戻り値: forecasts で追加・更新された行数
+def save_forecasts_bulk(rows, refreshed=(), history=(), elements=()):
+    conn = get_conn()
+    now = time.time()
+
+    with conn:
+        # rowcount はトリガー（forecast_versions）の分を含まない
+        count = conn.executemany(UPSERT_FORECAST, rows).rowcount
+        conn.executemany(INSERT_HISTORY, history)
+        conn.executemany(INSERT_ELEMENT, elements)
+        conn.executemany(UPSERT_REFRESH, [(code, now) for code in refreshed])
+    if count:
+        _sync_versions(conn)
+    return count
+
+
+# 最後に API から取得した時刻（UNIX 秒）。未取得なら None
+def load_refreshed_at(area_code):
+    conn = get_conn()
+    row = conn.execute(SELECT_REFRESH, (area_code,)).fetchone()
+    return row[0] if row else None
+
+
+# 戻り値: {area_code: fetched_at}（取ったことのないエリアは入らない）
+def load_refreshed_many(area_codes):
+    conn = get_conn()
+    return dict(conn.execute(SELECT_REFRESH_MANY, (json.dumps(list(area_codes)),)))
+
+
+# rows: (code, name, region, sort_order)。索引は丸ごと入れ替える
+def save_areas(rows):
+    conn = get_conn()
+
+    with conn:
+        conn.execute("DELETE FROM areas")
+        conn.executemany(INSERT_AREA, rows)
+
+
+def load_areas():
+    conn = get_conn()
+    return conn.execute(SELECT_AREAS).fetchall()
 
 
 def load_forecasts(area_code):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT date, weather, temp_min, temp_max
-        FROM forecasts
-        WHERE area_code = ?
-        ORDER BY date
-        LIMIT 5
-    """, (area_code,))
-
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    conn = get_conn()
+    _check_other_writes(conn)
+    rows = read_cache.get(
+        (DB_NAME, area_code),
+        lambda: conn.execute(SELECT_FORECASTS, (area_code,)).fetchall(),
+    )
+    # 覚えているリストは共有なので、呼び出し側にはコピーを渡す
+    return list(rows)
+
+
+# 戻り値: {area_code: load_forecasts と同じ行}（データの無いエリアは空リスト）
+def load_forecasts_many(area_codes):
+    conn = get_conn()
+    result = {code: [] for code in area_codes}
+    for code, *row in conn.execute(SELECT_FORECASTS_MANY, (json.dumps(list(area_codes)),)):
+        result[code].append(tuple(row))
+    return result
+
+
+# 無い日（None）も覚えておく
 def load_forecast_by_date(area_code, date):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT date, weather, temp_min, temp_max
-        FROM forecasts
-        WHERE area_code = ?
-        AND date = ?
-    """, (area_code, date))
-
-    row = cur.fetchone()
-    conn.close()
-    return row
+    conn = get_conn()
+    _check_other_writes(conn)
+    return read_cache.get(
+        (DB_NAME, area_code, date),
+        lambda: conn.execute(SELECT_FORECAST_BY_DATE, (area_code, date)).fetchone(),
+    )
+
+
+# 最新の発表のある系列: (sub_area, time_define, value)
+# 例: load_elements("130000", "short", "pops")
+def load_elements(office_code, term, element):
+    conn = get_conn()
+    return conn.execute(
+        SELECT_ELEMENTS, (office_code, office_code, term, term, element)
+    ).fetchall()
+
+
+# -------------------------
+# 履歴の検索
+# -------------------------
+# start〜end の全発表: (date, report_datetime, weather, temp_min, temp_max)
+def load_history_range(area_code, start, end):
+    conn = get_conn()
+    return conn.execute(SELECT_HISTORY_RANGE, (area_code, start, end)).fetchall()
+
+
+# start〜end の日ごとの最新発表: (date, report_datetime, weather, temp_min, temp_max)
+def load_latest_by_date(area_code, start, end):
+    conn = get_conn()
+    return conn.execute(SELECT_LATEST_BY_DATE, (area_code, start, end)).fetchall()
+
+
+# ある日付に対する発表の移り変わり: (report_datetime, weather, temp_min, temp_max)
+def load_date_history(area_code, date):
+    conn = get_conn()
+    return conn.execute(SELECT_DATE_HISTORY, (area_code, date)).fetchall()
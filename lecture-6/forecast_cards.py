@@ -0,0 +1,174 @@
+import flet as ft
+from datetime import datetime
+
+
+# -------------------------
+# 天気 → アイコン
+# -------------------------
+def weather_icon(text):
+    if "雪" in text:
+        return "❄️"
+    if "雷" in text:
+        return "⛈"
+    if "雨" in text:
+        return "🌧"
+    if "くもり" in text or "曇" in text:
+        return "☁️"
+    if "晴" in text:
+        return "☀️"
+    return "🌈"
+
+
+# -------------------------
+# 予報カード（作るのは最初の1回だけ、あとは文字を差し替える）
+#   Flet は前回送った値と比べて変わったプロパティだけ送るので、
+#   同じ Text を使い回せば都道府県を切り替えても差分は数十バイトで済む
+# -------------------------
+class ForecastCard(ft.Container):
+    def __init__(self, width=150, padding=16, icon_size=44, weather_size=11,
+                 spacing=6, show_date=True, show_weather=True):
+        super().__init__(
+            width=width,
+            padding=padding,
+            bgcolor="#1E1E1E",
+            border_radius=14,
+        )
+        self.date_text = ft.Text(weight="bold", visible=show_date)
+        self.icon_text = ft.Text(size=icon_size)
+        self.weather_text = ft.Text(size=weather_size, text_align="center", visible=show_weather)
+        self.temp_text = ft.Text()
+        self.content = ft.Column(
+            [self.date_text, self.icon_text, self.weather_text, self.temp_text],
+            horizontal_alignment="center",
+            spacing=spacing,
+        )
+
+    # row: (date, weather, low, high)
+    def set_row(self, row):
+        d, weather, low, high = row
+        weather = weather or ""   # 以前の取り込みで空欄が NULL で入っている行もある
+        self.date_text.value = datetime.fromisoformat(d).strftime("%m/%d")
+        self.icon_text.value = weather_icon(weather)
+        self.weather_text.value = weather
+        self.temp_text.value = f"{low}/{high}℃"
+        self.visible = True
+
+
+# -------------------------
+# カードの入れ物（足りない分だけ作り、余った分は隠す）
+# -------------------------
+class CardPool(ft.Row):
+    def __init__(self, make_card=ForecastCard, spacing=16, wrap=True, **kwargs):
+        super().__init__(wrap=wrap, spacing=spacing, **kwargs)
+        self.make_card = make_card
+
+    def show(self, rows):
+        for i, row in enumerate(rows):
+            if i == len(self.controls):
+                self.controls.append(self.make_card())
+            self.controls[i].set_row(row)
+        for card in self.controls[len(rows):]:
+            card.visible = False
+
+
+# -------------------------
+# 地方の比較表の1行（都道府県名 + 小さい日ごとのカード）
+# -------------------------
+# 比較表では天気の文字は省いてアイコンと気温だけ
+def small_card():
+    return ForecastCard(width=86, padding=8, icon_size=22, weather_size=None, spacing=2,
+                        show_weather=False)
+
+
+class RegionRow(ft.Row):
+    def __init__(self):
+        super().__init__(spacing=12, vertical_alignment=ft.CrossAxisAlignment.CENTER)
+        self.name_text = ft.Text(width=110, weight="bold")
+        self.days = CardPool(small_card, spacing=8, wrap=False)
+        self.controls = [self.name_text, self.days]
+
+    # item: (都道府県名, rows)
+    def set_row(self, item):
+        name, rows = item
+        self.name_text.value = name
+        self.days.show(rows)
+        self.visible = True
+
+
+class RegionGrid(ft.Column):
+    def __init__(self):
+        super().__init__(spacing=10)
+
+    def show(self, items):
+        for i, item in enumerate(items):
+            if i == len(self.controls):
+                self.controls.append(RegionRow())
+            self.controls[i].set_row(item)
+        for row in self.controls[len(items):]:
+            row.visible = False
+
+
+# -------------------------
+# 予報の表示欄（見出し + 状態メッセージ + 一覧 / 1日分 / 地方の比較表）
+#   表示を切り替えても子コントロールは入れ替えず、visible と値だけ変える
+# -------------------------
+class ForecastPanel(ft.Column):
+    def __init__(self, **kwargs):
+        super().__init__(spacing=20, scroll=ft.ScrollMode.AUTO, **kwargs)
+        self.title = ft.Text(size=26, weight="bold", visible=False)
+        self.status = ft.Text(visible=False)
+        self.cards = CardPool()
+        self.day_card = CardPool(
+            lambda: ForecastCard(width=200, padding=20, icon_size=48, weather_size=None,
+                                 spacing=8, show_date=False)
+        )
+        self.region_grid = RegionGrid()
+        self.controls = [self.title, self.status, self.cards, self.day_card, self.region_grid]
+
+    def set_status(self, message=None, color=None, size=None):
+        self.status.value = message
+        self.status.color = color
+        self.status.size = size
+        self.status.visible = bool(message)
+
+    # 都道府県の数日分
+    def show_list(self, pref, rows, loading=False):
+        self.title.value = f"{pref} の天気予報"
+        self.title.visible = True
+        if loading:
+            self.set_status("最新の予報を取得中…", color="#888888", size=12)
+        else:
+            self.set_status()
+        self.cards.show(rows)
+        self.day_card.show([])
+        self.region_grid.show([])
+        self.update()
+
+    # 選んだ日の1日分
+    def show_day(self, pref, row):
+        self.cards.show([])
+        self.region_grid.show([])
+        if not row:
+            self.title.visible = False
+            self.set_status("この日の予報データはありません", color="red")
+            self.day_card.show([])
+        else:
+            self.title.value = f"{pref}（{row[0]}）"
+            self.title.visible = True
+            self.set_status()
+            self.day_card.show([row])
+        self.update()
+
+    # 地方の都道府県を並べた比較表（items: [(都道府県名, rows), ...]）
+    def show_region(self, region, items):
+        self.title.value = f"{region} の天気予報"
+        self.title.visible = True
+        self.set_status()
+        self.cards.show([])
+        self.day_card.show([])
+        self.region_grid.show(items)
+        self.update()
+
+    def show_error(self, message):
+        self.set_status(message, color="red")
+        self.update()
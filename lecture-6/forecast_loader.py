@@ -0,0 +1,134 @@
+import asyncio
+import sqlite3
+
+import requests
+
+from db import load_forecasts, load_forecasts_many, load_refreshed_many
+from jma_api import fetched_recently, is_fresh, refresh_if_stale, refresh_many_if_stale
+
+
+# -------------------------
+# 都道府県選択 → 表示 の流れ
+#   1. DB にあるものをすぐ on_rows(code, rows, fresh) で表示
+#   2. 古ければ裏のスレッドで API → DB を更新し、終わったら fresh=True で表示し直す
+#   3. 別の都道府県が選ばれたら更新中のタスクは取り消す
+# 地方を選んだとき（select_region）
+#   その地方の全エリアを SQL 1回でメモリに載せ、古いエリアは裏でまとめて取り直す
+#   → 続く都道府県クリックは DB にも API にも行かずメモリから描ける
+#   地方全体が読めたら / 更新されたら on_region(memory) を呼ぶ（比較表用）
+# -------------------------
+class ForecastLoader:
+    def __init__(self, on_rows, on_error=None, max_age=None, on_region=None):
+        self.on_rows = on_rows
+        self.on_error = on_error
+        self.on_region = on_region
+        self.max_age = max_age
+        self.current = None
+        self._task = None
+
+        self.region = []
+        self.memory = {}       # area_code → rows
+        self.fetched_at = {}   # area_code → API から取った時刻
+        self._region_task = None
+
+    def _fresh(self, code):
+        if code not in self.memory:
+            return is_fresh(code, self.max_age)
+        return fetched_recently(self.fetched_at.get(code), self.max_age)
+
+    def _rows(self, code):
+        if code in self.memory:
+            return self.memory[code]
+        return load_forecasts(code)
+
+    # ---------- 地方 ----------
+    def _load_region(self):
+        self.memory = load_forecasts_many(self.region)
+        self.fetched_at = load_refreshed_many(self.region)
+
+    async def select_region(self, codes):
+        if self._region_task and not self._region_task.done():
+            self._region_task.cancel()
+        # 都道府県の選択は解除する（前の都道府県の更新結果はもう描かない）
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self.current = None
+
+        self.region = list(codes)
+        self._load_region()
+        if self.on_region:
+            self.on_region(self.memory)
+
+        stale = [code for code in self.region if not self._fresh(code)]
+        if not stale:
+            self._region_task = None
+            return None
+
+        self._region_task = asyncio.create_task(self._warm_up(stale))
+        return self._region_task
+
+    async def _warm_up(self, codes):
+        region = self.region
+        try:
+            report = await asyncio.to_thread(refresh_many_if_stale, codes, self.max_age)
+        except (requests.RequestException, sqlite3.Error, ValueError, KeyError, IndexError) as e:
+            print("地方の先読みに失敗:", e)
+            if self.current in codes and self.on_error:
+                self.on_error(self.current, e)
+            return
+
+        # 途中で別の地方が選ばれていたら捨てる
+        if region is not self.region:
+            return
+
+        self._load_region()
+        if self.on_region:
+            self.on_region(self.memory)
+        if self.current not in codes:
+            return
+
+        # 表示中のエリアが取れなかった → 古い行のまま「取得中」にせず、失敗を知らせる
+        error = report.get(self.current, {}).get("error")
+        if error is not None:
+            if self.on_error:
+                self.on_error(self.current, requests.RequestException(error))
+            return
+        self.on_rows(self.current, self.memory[self.current], self._fresh(self.current))
+
+    # ---------- 都道府県 ----------
+    async def select(self, code):
+        self.current = code
+
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+        fresh = self._fresh(code)
+        self.on_rows(code, self._rows(code), fresh)
+
+        if fresh:
+            self._task = None
+            return None
+
+        self._task = asyncio.create_task(self._refresh(code))
+        return self._task
+
+    async def _refresh(self, code):
+        try:
+            # スレッド側の HTTP は止められないが、結果は DB に入るだけで画面には出さない
+            # 地方の先読みで取得中なら、それが終わるのを待つだけ（失敗したらここで例外）
+            await asyncio.to_thread(refresh_if_stale, code, self.max_age)
+        except (requests.RequestException, sqlite3.Error, ValueError, KeyError, IndexError) as e:
+            if code == self.current and self.on_error:
+                self.on_error(code, e)
+            return
+
+        rows = load_forecasts(code)
+        if code in self.memory:
+            self.memory[code] = rows
+            self.fetched_at.update(load_refreshed_many([code]))
+
+        if code != self.current:
+            return
+
+        self.on_rows(code, rows, True)
@@ -0,0 +1,127 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+# -------------------------
+# ディスク上の HTTP レスポンスキャッシュ
+#   - TTL 内ならネットワークに出ない
+#   - TTL 切れは ETag / Last-Modified で条件付き GET（304 なら本文を再利用）
+#   - 合計サイズが max_bytes を超えたら古いものから削除
+# -------------------------
+CACHE_DIR = ".http_cache"
+
+
+class HttpCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl=600, max_bytes=20 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "miss": 0, "revalidated": 0, "evicted": 0}
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _load(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, path, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def get_json(self, url, ttl=None, session=None, timeout=5):
+        ttl = self.ttl if ttl is None else ttl
+        path = self._path(url)
+        entry = self._load(path)
+
+        # TTL 内 → そのまま返す
+        if entry and time.time() - entry["fetched_at"] < ttl:
+            self._count("hit")
+            # 読んだあとに他のスレッド・プロセスが _evict で消していても、中身はもう手元にある
+            with contextlib.suppress(OSError):
+                os.utime(path)
+            return json.loads(entry["body"])
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        res = (session or requests).get(url, headers=headers, timeout=timeout)
+
+        # 304 → 本文は手元のものを使い、取得時刻だけ更新
+        if res.status_code == 304 and entry:
+            self._count("revalidated")
+            entry["fetched_at"] = time.time()
+            self._store(path, entry)
+            return json.loads(entry["body"])
+
+        res.raise_for_status()
+        self._count("miss")
+
+        body = res.content.decode("utf-8")
+        self._store(path, {
+            "url": url,
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "body": body,
+        })
+        self._evict()
+        return json.loads(body)
+
+    def _evict(self):
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        # 最後に使われた時刻（mtime）が古い順に消す
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self._count("evicted")
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
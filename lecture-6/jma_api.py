@@ -1,24 +1,228 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from datetime import datetime
-from db import save_forecast
+from requests.adapters import HTTPAdapter
+
+from db import load_refreshed_at, load_refreshed_many, save_forecasts_bulk
+from http_cache import HttpCache
+from jma_parser import forecast_rows, parse_records
 
+AREA_URL = "https://www.jma.go.jp/bosai/common/const/area.json"
 FORECAST_URL = "https://www.jma.go.jp/bosai/forecast/data/forecast/{}.json"
 
+AREA_TTL = 24 * 60 * 60
+
+# weather.db の予報がこれより古くなったら API から取り直す
+FORECAST_MAX_AGE = 30 * 60
+
+# 予報は1日数回しか更新されないので 10 分は手元のものを使う
+FORECAST_TTL = 600
+
+# -------------------------
+# HTTP セッション（keep-alive で接続を使い回す）
+# -------------------------
+_session = None
+_pool_size = 0
+_session_lock = threading.Lock()
+
+
+# 今より大きい pool_size を頼まれたら、その大きさの接続プールに付け替える
+# （小さいままだと並列数を上げたときに urllib3 が接続を捨てては張り直す）
+# 古いアダプタは閉じない（他のスレッドが使っている途中かもしれないので）
+def get_session(pool_size=10):
+    global _session, _pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _pool_size = pool_size
+        return _session
+
+
+http_cache = HttpCache()
+
+
+def fetch_forecast(area_code):
+    return http_cache.get_json(
+        FORECAST_URL.format(area_code),
+        ttl=FORECAST_TTL,
+        session=get_session(),
+    )
 
+
+# area.json → (code, name, region, sort_order) の行
+def fetch_area_rows():
+    res = http_cache.get_json(AREA_URL, ttl=AREA_TTL, session=get_session())
+    centers = res["centers"]
+
+    rows = []
+    for code, info in res["offices"].items():
+        parent = info.get("parent")
+        if parent in centers:
+            rows.append((code, info["name"], centers[parent]["name"], len(rows)))
+
+    return rows
+
+
+# 履歴用に発表時刻をつけた行
+def history_rows(rows, res):
+    report = res[0]["reportDatetime"]
+    return [row[:2] + (report,) + row[2:] for row in rows]
+
+
+# 1回の走査で全系列を取り出し、forecasts / 履歴 の行もそこから作る
+def parse_all(area_code, res):
+    records = list(parse_records(area_code, res))
+    rows = forecast_rows(area_code, records)
+    return rows, history_rows(rows, res), records
+
+
+# 戻り値: 追加・更新された行数
 def fetch_and_store(area_code):
-    res = requests.get(FORECAST_URL.format(area_code), timeout=5).json()
+    rows, history, records = parse_all(area_code, fetch_forecast(area_code))
+    return save_forecasts_bulk(
+        rows, refreshed=[area_code], history=history, elements=records
+    )
+
+
+# -------------------------
+# 鮮度つき取得（古いときだけ API へ。同じエリアの取得は同時に1本まで）
+# -------------------------
+# 取得中の印。終わったら done を立て、失敗していれば error に例外を残す
+# （待っていた側は成功したかどうかをここで知る）
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def fetched_recently(fetched_at, max_age=None):
+    max_age = FORECAST_MAX_AGE if max_age is None else max_age
+    return fetched_at is not None and time.time() - fetched_at < max_age
+
+
+def is_fresh(area_code, max_age=None):
+    return fetched_recently(load_refreshed_at(area_code), max_age)
+
+
+# 戻り値: 自分で API から取り直したら True
+def refresh_if_stale(area_code, max_age=None):
+    if is_fresh(area_code, max_age):
+        return False
+
+    with _inflight_lock:
+        flight = _inflight.get(area_code)
+        owner = flight is None
+        if owner:
+            flight = _inflight[area_code] = _Flight()
+
+    # 他のスレッドが取得中 → 終わるのを待って、その結果を使う（失敗ならこちらも失敗）
+    if not owner:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return False
+
+    try:
+        fetch_and_store(area_code)
+        return True
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[area_code]
+        flight.done.set()
+
+
+# -------------------------
+# 複数エリアの一括取得
+# -------------------------
+def _fetch_and_parse(area_code):
+    start = time.perf_counter()
+    try:
+        rows, history, records = parse_all(area_code, fetch_forecast(area_code))
+        error = None
+    except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+        rows = []
+        history = []
+        records = []
+        error = str(e)
+
+    elapsed = time.perf_counter() - start
+    return area_code, rows, history, records, elapsed, error
+
+
+# 戻り値: {area_code: {"elapsed": 秒, "rows": 件数, "error": None or メッセージ}}
+def fetch_and_store_many(area_codes, concurrency=8):
+    get_session(pool_size=concurrency)
+
+    all_rows = []
+    all_history = []
+    all_records = []
+    refreshed = []
+    report = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = pool.map(_fetch_and_parse, area_codes)
+        for code, rows, history, records, elapsed, error in results:
+            all_rows.extend(rows)
+            all_history.extend(history)
+            all_records.extend(records)
+            if error is None:
+                refreshed.append(code)
+            report[code] = {"elapsed": elapsed, "rows": len(rows), "error": error}
+
+    # DB への書き込みは最後に1回だけ
+    save_forecasts_bulk(
+        all_rows, refreshed=refreshed, history=all_history, elements=all_records
+    )
+    return report
 
-    short = res[0]["timeSeries"][0]
-    temps = res[0]["timeSeries"][2]["areas"][0]["temps"]
 
-    dates = short["timeDefines"]
-    weathers = short["areas"][0]["weathers"]
+# 地方ごとの先読み: 古いエリアだけまとめて並行に取り直す
+# 取得中のエリアは refresh_if_stale と同じ印を付けるので、
+# その間に都道府県がクリックされても二重に取りに行かず、終わるのを待つ
+# 戻り値: 自分で取り直したエリアの report（fetch_and_store_many と同じ形）
+def refresh_many_if_stale(area_codes, max_age=None, concurrency=8):
+    fetched_at = load_refreshed_many(area_codes)
+    stale = [
+        code for code in area_codes
+        if not fetched_recently(fetched_at.get(code), max_age)
+    ]
 
-    for i in range(min(5, len(dates))):
-        date = datetime.fromisoformat(dates[i]).date().isoformat()
-        weather = weathers[i]
+    with _inflight_lock:
+        owned = {code: _Flight() for code in stale if code not in _inflight}
+        _inflight.update(owned)
 
-        low = temps[i * 2] if i * 2 < len(temps) else None
-        high = temps[i * 2 + 1] if i * 2 + 1 < len(temps) else None
+    if not owned:
+        return {}
 
-        save_forecast(area_code, date, weather, low, high)
+    report = {}
+    try:
+        report = fetch_and_store_many(list(owned), concurrency=concurrency)
+    except Exception as e:
+        for flight in owned.values():
+            flight.error = e
+        raise
+    finally:
+        # 取れなかったエリアは、待っていた refresh_if_stale に例外として渡す
+        for code, flight in owned.items():
+            error = report.get(code, {}).get("error")
+            if flight.error is None and error is not None:
+                flight.error = requests.RequestException(f"{code}: {error}")
+        with _inflight_lock:
+            for code in owned:
+                del _inflight[code]
+        for flight in owned.values():
+            flight.done.set()
+    return report
@@ -0,0 +1,95 @@
+from collections import namedtuple
+from datetime import datetime
+
+# -------------------------
+# 気象庁 予報 JSON → 型付きレコード
+#   res[0] = 短期予報（term="short"）, res[1] = 週間予報（term="week"）
+#   timeSeries / areas のすべての系列を 1 回の走査で取り出す
+# -------------------------
+ForecastRecord = namedtuple(
+    "ForecastRecord",
+    "office_code report_datetime term sub_area time_define element value",
+)
+
+TERMS = ("short", "week")
+
+# 数値として保存する系列（それ以外は文字列・コードのまま）
+NUMERIC_ELEMENTS = {
+    "pops",
+    "temps",
+    "tempsMin", "tempsMinUpper", "tempsMinLower",
+    "tempsMax", "tempsMaxUpper", "tempsMaxLower",
+}
+
+
+# 数値の系列の空欄は None、文字列の系列（天気など）は "" のまま残す
+def _typed(element, value):
+    if value is None:
+        return None
+    if element in NUMERIC_ELEMENTS:
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return value
+
+
+def parse_records(office_code, res):
+    for term, report in zip(TERMS, res):
+        report_datetime = report["reportDatetime"]
+
+        for series in report["timeSeries"]:
+            defines = series["timeDefines"]
+
+            for area in series["areas"]:
+                sub_area = area["area"]["code"]
+
+                for element, values in area.items():
+                    if element == "area" or not isinstance(values, list):
+                        continue
+                    for time_define, value in zip(defines, values):
+                        yield ForecastRecord(
+                            office_code, report_datetime, term, sub_area,
+                            time_define, element, _typed(element, value),
+                        )
+
+
+# -------------------------
+# レコード → forecasts テーブルの行
+#   天気: 短期予報の先頭の地域
+#   気温: 短期予報の先頭の地点（00時 = 最低、09時 = 最高）、
+#         無い日は週間予報の tempsMin / tempsMax で補う
+# -------------------------
+def forecast_rows(office_code, records, days=5):
+    weathers = {}
+    temp_min = {}
+    temp_max = {}
+    week_min = {}
+    week_max = {}
+    first = {}
+
+    for r in records:
+        key = (r.term, r.element)
+        if first.setdefault(key, r.sub_area) != r.sub_area:
+            continue
+
+        moment = datetime.fromisoformat(r.time_define)
+        date = moment.date().isoformat()
+
+        if key == ("short", "weathers"):
+            weathers.setdefault(date, r.value)
+        elif key == ("short", "temps"):
+            target = temp_min if moment.hour == 0 else temp_max
+            target.setdefault(date, r.value)
+        elif key == ("week", "tempsMin"):
+            week_min[date] = r.value
+        elif key == ("week", "tempsMax"):
+            week_max[date] = r.value
+
+    rows = []
+    for date, weather in list(weathers.items())[:days]:
+        low = temp_min.get(date, week_min.get(date))
+        high = temp_max.get(date, week_max.get(date))
+        rows.append((office_code, date, weather, low, high))
+
+    return rows
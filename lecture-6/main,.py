@@ -1,49 +1,10 @@
 import flet as ft
-import requests
-from datetime import datetime, date
+from datetime import date
 
-from db import init_db, load_forecasts, load_forecast_by_date
-from jma_api import fetch_and_store
-
-AREA_URL = "https://www.jma.go.jp/bosai/common/const/area.json"
-
-
-# -------------------------
-# 地方 → 都道府県 階層取得
-# -------------------------
-def get_area_hierarchy():
-    res = requests.get(AREA_URL, timeout=5).json()
-    centers = res["centers"]
-    offices = res["offices"]
-
-    hierarchy = {}
-    for c in centers.values():
-        hierarchy[c["name"]] = {}
-
-    for code, info in offices.items():
-        parent = info.get("parent")
-        if parent in centers:
-            region = centers[parent]["name"]
-            hierarchy[region][info["name"]] = code
-
-    return hierarchy
-
-
-# -------------------------
-# 天気 → アイコン
-# -------------------------
-def weather_icon(text):
-    if "雪" in text:
-        return "❄️"
-    if "雷" in text:
-        return "⛈"
-    if "雨" in text:
-        return "🌧"
-    if "くもり" in text or "曇" in text:
-        return "☁️"
-    if "晴" in text:
-        return "☀️"
-    return "🌈"
+from area_index import load_area_index, refresh_area_index_in_background
+from db import init_db, load_forecast_by_date
+from forecast_cards import ForecastPanel
+from forecast_loader import ForecastLoader
 
 
 # -------------------------
@@ -55,80 +16,63 @@ def main(page: ft.Page):
     page.bgcolor = "#121212"
 
     init_db()
-    hierarchy = get_area_hierarchy()
+    area_index = load_area_index()
 
     selected_area_code = None
     selected_pref_name = None
 
-    content_area = ft.Column(
-        expand=True,
-        spacing=20,
-        scroll=ft.ScrollMode.AUTO,
-    )
+    # カードは作り直さず、値だけ差し替える（forecast_cards.py）
+    content_area = ForecastPanel(expand=True)
 
     # -------- 地方変更 --------
-    def on_region_change(e):
+    # 地方の全都道府県を1回で読み込み、古いものは裏でまとめて取り直す
+    async def on_region_change(e):
+        nonlocal selected_area_code, selected_pref_name
+
         region = region_dd.value
+        prefs = area_index.prefs(region)
         pref_dd.options = [
-            ft.dropdown.Option(p) for p in hierarchy[region].keys()
+            ft.dropdown.Option(p) for p in prefs
         ]
         pref_dd.disabled = False
         pref_dd.value = None
+        selected_area_code = None
+        selected_pref_name = None
         page.update()
 
+        await loader.select_region([area_index.code_of[p] for p in prefs])
+
     # -------- 都道府県変更 --------
-    def on_pref_change(e):
+    # DB の内容を先に出し、API → DB の更新は裏で行う
+    async def on_pref_change(e):
         nonlocal selected_area_code, selected_pref_name
 
-        region = region_dd.value
         pref = pref_dd.value
-        code = hierarchy[region][pref]
+        code = area_index.code_of[pref]
 
         selected_area_code = code
         selected_pref_name = pref
 
-        # API → DB
-        fetch_and_store(code)
+        await loader.select(code)
 
-        # DB → UI
-        rows = load_forecasts(code)
-        show_forecast_list(pref, rows)
+    # 見出しは届いた code から引く（選択が変わった直後でも取り違えない）
+    def on_rows(code, rows, fresh):
+        content_area.show_list(area_index.name_of.get(code, code), rows, loading=not fresh)
 
-    # -------- 一覧表示 --------
-    def show_forecast_list(pref, rows):
-        content_area.controls.clear()
+    def on_error(code, e):
+        content_area.show_error("最新の予報を取得できませんでした")
 
-        content_area.controls.append(
-            ft.Text(f"{pref} の天気予報", size=26, weight="bold")
-        )
+    # 都道府県を選ぶまでは地方の比較表を出しておく
+    def on_region(memory):
+        if selected_area_code:
+            return
+        region = region_dd.value
+        content_area.show_region(region, [
+            (p, memory.get(area_index.code_of[p], []))
+            for p in area_index.prefs(region)
+        ])
 
-        cards = ft.Row(wrap=True, spacing=16)
-
-        for d, weather, low, high in rows:
-            icon = weather_icon(weather)
-            disp_date = datetime.fromisoformat(d).strftime("%m/%d")
-
-            cards.controls.append(
-                ft.Container(
-                    width=150,
-                    padding=16,
-                    bgcolor="#1E1E1E",
-                    border_radius=14,
-                    content=ft.Column(
-                        [
-                            ft.Text(disp_date, weight="bold"),
-                            ft.Text(icon, size=44),
-                            ft.Text(weather, size=11, text_align="center"),
-                            ft.Text(f"{low}/{high}℃"),
-                        ],
-                        horizontal_alignment="center",
-                        spacing=6,
-                    ),
-                )
-            )
-
-        content_area.controls.append(cards)
-        page.update()
+    loader = ForecastLoader(on_rows, on_error, on_region=on_region)
 
     # -------- DatePicker --------
     def on_date_change(e):
@@ -140,42 +84,7 @@ def main(page: ft.Page):
 
         date_str = e.control.value.strftime("%Y-%m-%d")
         row = load_forecast_by_date(selected_area_code, date_str)
-
-        content_area.controls.clear()
-
-        if not row:
-            content_area.controls.append(
-                ft.Text("この日の予報データはありません", color="red")
-            )
-            page.update()
-            return
-
-        d, weather, low, high = row
-        icon = weather_icon(weather)
-
-        content_area.controls.append(
-            ft.Text(f"{selected_pref_name}（{d}）", size=26, weight="bold")
-        )
-
-        content_area.controls.append(
-            ft.Container(
-                width=200,
-                padding=20,
-                bgcolor="#1E1E1E",
-                border_radius=14,
-                content=ft.Column(
-                    [
-                        ft.Text(icon, size=48),
-                        ft.Text(weather, text_align="center"),
-                        ft.Text(f"{low}/{high}℃"),
-                    ],
-                    horizontal_alignment="center",
-                    spacing=8,
-                ),
-            )
-        )
-
-        page.update()
+        content_area.show_day(selected_pref_name, row)
 
     date_picker = ft.DatePicker(
         value=date.today(),
@@ -195,7 +104,7 @@ def main(page: ft.Page):
     # -------- UI --------
     region_dd = ft.Dropdown(
         label="地方",
-        options=[ft.dropdown.Option(r) for r in hierarchy.keys()],
+        options=[ft.dropdown.Option(r) for r in area_index.regions()],
         on_change=on_region_change,
         width=220,
     )
@@ -223,6 +132,17 @@ def main(page: ft.Page):
         )
     )
 
+    # -------- 地域一覧の裏更新 --------
+    def on_area_index_change(index):
+        nonlocal area_index
+        area_index = index
+        region_dd.options = [
+            ft.dropdown.Option(r) for r in area_index.regions()
+        ]
+        page.update()
+
+    refresh_area_index_in_background(area_index, on_area_index_change)
+
 
 if __name__ == "__main__":
     ft.app(target=main)
@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+
+# -------------------------
+# db.py の読み込み結果の LRU キャッシュ（プロセス内）
+#   キー: (DB ファイル, area_code, ...) / 同じエリアのキーは area ごとにまとめて捨てられる
+#   - 件数が max_entries を超えたら最後に使われたのが古いものから捨てる
+#   - 読んでいる間に同じエリアへの書き込みがあったら、その結果は入れない
+#     （エリアごとの世代番号を読み始めと入れるときで比べる）
+#   別の接続・別プロセスからの書き込みはここでは分からないので、db.py が
+#   エリアごとの書き込み世代（forecast_versions）を sync() に渡し、進んだエリアだけ捨てる
+# -------------------------
+MISSING = object()
+
+
+class LruCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key → 値
+        self._keys = {}                # (DB, area_code) → その area のキーの集合
+        self._gen = {}                 # (DB, area_code) → 書き込みの世代
+        self._epoch = 0                # clear() の回数
+        self._versions = {}            # DB → {area_code: sync() で見た書き込み世代}
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "miss": 0, "invalidated": 0, "evicted": 0, "cleared": 0}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["hit"] + stats["miss"]
+        stats["hit_ratio"] = stats["hit"] / total if total else 0.0
+        return stats
+
+    def get(self, key, load):
+        area = key[:2]
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is not MISSING:
+                self._entries.move_to_end(key)
+                self._stats["hit"] += 1
+                return value
+            self._stats["miss"] += 1
+            gen = (self._epoch, self._gen.get(area, 0))
+
+        value = load()
+
+        with self._lock:
+            if self.max_entries and (self._epoch, self._gen.get(area, 0)) == gen:
+                self._entries[key] = value
+                self._keys.setdefault(area, set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    old, _ = self._entries.popitem(last=False)
+                    self._forget(old)
+                    self._stats["evicted"] += 1
+        return value
+
+    def _forget(self, key):
+        keys = self._keys.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[key[:2]]
+
+    # (DB, area_code) のキーを全部捨てる
+    def invalidate(self, db_name, area_codes):
+        with self._lock:
+            self._invalidate(db_name, area_codes)
+
+    def _invalidate(self, db_name, area_codes):
+        for code in area_codes:
+            area = (db_name, code)
+            self._gen[area] = self._gen.get(area, 0) + 1
+            for key in self._keys.pop(area, ()):
+                del self._entries[key]
+                self._stats["invalidated"] += 1
+
+    # versions: {area_code: 書き込み世代}（世代は増えるだけ）
+    # 前回より進んだエリアだけ捨てる。スレッドの順番が前後して古い世代が
+    # 後から来ても、覚えている世代は戻さない
+    # 初めて見る DB はそれまでの書き込みが分からないので、その DB の分を全部捨てる
+    def sync(self, db_name, versions):
+        with self._lock:
+            known = self._versions.get(db_name)
+            if known is None:
+                known = self._versions[db_name] = {}
+                self._invalidate(db_name, [area[1] for area in self._keys if area[0] == db_name])
+            changed = [code for code, version in versions.items()
+                       if version > known.get(code, 0)]
+            for code in changed:
+                known[code] = versions[code]
+            self._invalidate(db_name, changed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self._epoch += 1
+            self._stats["cleared"] += 1
@@ -0,0 +1,260 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from urllib.parse import unquote
+
+import requests
+
+import jma_api
+from area_index import load_area_index, refresh_area_index
+from db import (
+    init_db, load_areas, load_forecast_by_date, load_forecasts, load_refreshed_many,
+)
+
+# -------------------------
+# 予報の配信サービス（Flet なしで weather.db を HTTP で読む）
+#   GET /areas                         → [{code, name, region}, ...]
+#   GET /forecast/{area_code}          → {area_code, fetched_at, forecasts: [...]}
+#   GET /forecast/{area_code}/{date}   → {area_code, date, weather, temp_min, temp_max}
+#   応答の JSON は1回だけ作り、バイト列（そのまま / gzip）と ETag を覚えておく
+#   → 2回目からは DB にも json.dumps にも行かず書き出すだけ
+#   裏のタスクが古いエリアを API から取り直し、取得時刻が変わったエリアの応答を捨てる
+#   （Flet アプリなど別プロセスが weather.db を更新した場合も同じ判定で捨てる）
+# -------------------------
+REFRESH_INTERVAL = 60
+GZIP_MIN_BYTES = 256   # これより小さい応答は圧縮しない（ヘッダの方が大きくなる）
+
+REASONS = {200: "OK", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed"}
+
+
+class Response:
+    def __init__(self, status, data):
+        self.status = status
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+        self.gzip = gzip.compress(self.body, 6) if len(self.body) >= GZIP_MIN_BYTES else None
+        # gzip 版は中身のバイト列が違うので別の ETag にする
+        digest = hashlib.md5(self.body).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"' if self.gzip else None
+
+
+def not_found(message="not found"):
+    return Response(404, {"error": message})
+
+
+# "/forecast/%31%33%30000/" も "/forecast//130000" も ("forecast", "130000") にする
+# （同じ応答を別々のキーで覚えて、捨て損ねないように）
+def split_path(path):
+    return tuple(unquote(p) for p in path.split("?")[0].split("/") if p)
+
+
+# If-None-Match: "a", "b" / W/"a" / * → 比べる ETag の集合
+def split_etags(value):
+    return {tag.strip().removeprefix("W/") for tag in value.split(",") if tag.strip()}
+
+
+class ForecastService:
+    def __init__(self, max_age=None, refresh_interval=REFRESH_INTERVAL,
+                 max_entries=4096, concurrency=8):
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.max_entries = max_entries
+        self.concurrency = concurrency
+
+        self.cache = {}        # split_path() の結果 → Response（200 のものだけ）
+        self.fetched_at = {}   # area_code → 応答を作ったときの取得時刻
+        self.areas_refreshed_at = time.time()
+        self.stats = {"requests": 0, "hit": 0, "miss": 0, "invalidated": 0}
+        self._refresher = None
+
+    # ---------- 応答を作る ----------
+    # DB は手元の SQLite なので、作るときはイベントループのスレッドでそのまま読む
+    # parts: split_path() の結果（キャッシュのキーと同じもの）
+    def build(self, parts):
+        if parts == ("areas",):
+            return Response(200, [
+                {"code": code, "name": name, "region": region}
+                for code, name, region in load_areas()
+            ])
+
+        if not parts or parts[0] != "forecast" or len(parts) not in (2, 3):
+            return not_found()
+
+        code = parts[1]
+        if len(parts) == 2:
+            rows = load_forecasts(code)
+            if not rows:
+                return not_found(f"no forecast for {code}")
+            return Response(200, {
+                "area_code": code,
+                "fetched_at": self.fetched_at.get(code),
+                "forecasts": [
+                    {"date": d, "weather": w, "temp_min": low, "temp_max": high}
+                    for d, w, low, high in rows
+                ],
+            })
+
+        row = load_forecast_by_date(code, parts[2])
+        if not row:
+            return not_found(f"no forecast for {code} on {parts[2]}")
+        d, w, low, high = row
+        return Response(200, {
+            "area_code": code, "date": d, "weather": w, "temp_min": low, "temp_max": high,
+        })
+
+    def get(self, path):
+        parts = split_path(path)
+        response = self.cache.get(parts)
+        if response is not None:
+            self.stats["hit"] += 1
+            return response
+
+        self.stats["miss"] += 1
+        response = self.build(parts)
+        if response.status == 200 and self.max_entries:
+            # 入れた順に古いものから捨てる
+            if len(self.cache) >= self.max_entries:
+                del self.cache[next(iter(self.cache))]
+            self.cache[parts] = response
+        return response
+
+    # ---------- 捨てる ----------
+    def invalidate(self, code):
+        for parts in [p for p in self.cache if p[:2] == ("forecast", code)]:
+            del self.cache[parts]
+            self.stats["invalidated"] += 1
+
+    # 取得時刻が前回と変わったエリアだけ捨てる
+    def invalidate_changed(self):
+        codes = [row[0] for row in load_areas()]
+        latest = load_refreshed_many(codes)
+        for code, fetched_at in latest.items():
+            if self.fetched_at.get(code) != fetched_at:
+                self.invalidate(code)
+        self.fetched_at = latest
+
+    # ---------- 裏の更新 ----------
+    def refresh(self):
+        if time.time() - self.areas_refreshed_at >= jma_api.AREA_TTL:
+            refresh_area_index()
+            self.areas_refreshed_at = time.time()
+        codes = [row[0] for row in load_areas()]
+        jma_api.refresh_many_if_stale(codes, self.max_age, self.concurrency)
+
+    async def refresh_loop(self):
+        while True:
+            areas = load_areas()
+            try:
+                await asyncio.to_thread(self.refresh)
+            except (requests.RequestException, sqlite3.Error, ValueError, KeyError) as e:
+                print("予報の更新に失敗:", e)
+            if load_areas() != areas:
+                self.cache.pop(("areas",), None)
+            self.invalidate_changed()
+            await asyncio.sleep(self.refresh_interval)
+
+    # ---------- HTTP ----------
+    def write_response(self, writer, response, headers, head=False):
+        body, etag = response.body, response.etag
+        use_gzip = response.gzip and "gzip" in headers.get("accept-encoding", "")
+        if use_gzip:
+            body, etag = response.gzip, response.gzip_etag
+
+        # 手元と同じ内容（同じ Content-Encoding の版）→ 本文なしの 304
+        tags = split_etags(headers.get("if-none-match", ""))
+        if response.status == 200 and (etag in tags or "*" in tags):
+            lines = ["HTTP/1.1 304 Not Modified", f"ETag: {etag}", "Vary: Accept-Encoding"]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+            return
+
+        lines = [f"HTTP/1.1 {response.status} {REASONS[response.status]}"]
+        if use_gzip:
+            lines.append("Content-Encoding: gzip")
+        lines += [
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"ETag: {etag}",
+            "Vary: Accept-Encoding",
+        ]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        if not head:
+            writer.write(body)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    self.write_response(writer, Response(400, {"error": "bad request"}), {})
+                    break
+
+                # 本文は使わないが、読み捨てないと次のリクエストの頭として読んでしまう
+                # 長さの分からない本文（chunked など）は応答したら接続を閉じる
+                length = headers.get("content-length", "0")
+                readable = length.isdigit() and "transfer-encoding" not in headers
+                if readable:
+                    await reader.readexactly(int(length))
+
+                self.stats["requests"] += 1
+                if not readable:
+                    response = Response(400, {"error": "bad request"})
+                elif method not in ("GET", "HEAD"):
+                    response = Response(405, {"error": "method not allowed"})
+                else:
+                    response = self.get(target)
+                self.write_response(writer, response, headers, head=method == "HEAD")
+                await writer.drain()
+
+                keep_alive = (readable and version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.invalidate_changed()
+        server = await asyncio.start_server(self.handle, host, port)
+        if self.refresh_interval:
+            self._refresher = asyncio.create_task(self.refresh_loop())
+        return server
+
+
+async def serve(host="127.0.0.1", port=8080, **kwargs):
+    init_db()
+    load_area_index()
+    service = ForecastService(**kwargs)
+    server = await service.start(host, port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"serving weather.db on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    # python service.py [port]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    try:
+        asyncio.run(serve(port=port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -------------------------
+# 気象庁 API のスタブ（ベンチマーク・動作確認用）
+# -------------------------
+AREA_PATH = "/bosai/common/const/area.json"
+FORECAST_PATH = "/bosai/forecast/data/forecast/"
+WEATHERS = ["晴れ", "くもり", "雨", "晴れ時々くもり", "くもり一時雨", "雪"]
+
+
+def _iso(d, hour=0):
+    return datetime.combine(d, dtime(hour)).isoformat() + "+09:00"
+
+
+REGIONS = ["北海道地方", "東北地方", "関東甲信地方", "東海地方", "北陸地方",
+           "近畿地方", "中国地方", "四国地方", "九州北部地方", "沖縄地方"]
+
+
+def make_area_json(n_offices=58):
+    centers = {}
+    for i, name in enumerate(REGIONS):
+        code = f"0{i + 1:02d}000"
+        centers[code] = {"name": name, "enName": "", "officeName": "", "children": []}
+
+    center_codes = list(centers)
+    offices = {}
+    for i in range(n_offices):
+        code = f"{i + 1:02d}0000" if i < 47 else f"01{i - 46}000"
+        parent = center_codes[i * len(center_codes) // n_offices]
+        offices[code] = {"name": f"官署{code}", "enName": "", "officeName": "",
+                         "parent": parent, "children": []}
+        centers[parent]["children"].append(code)
+
+    return {"centers": centers, "offices": offices, "class10s": {},
+            "class15s": {}, "class20s": {}}
+
+
+def make_forecast(area_code, base=None):
+    base = base or date.today()
+    seed = int(area_code) // 1000
+    days = [base + timedelta(days=i) for i in range(7)]
+    weathers = [WEATHERS[(seed + i) % len(WEATHERS)] for i in range(7)]
+    report = _iso(base, 11)
+
+    short = {
+        "publishingOffice": "スタブ気象台",
+        "reportDatetime": report,
+        "timeSeries": [
+            {
+                "timeDefines": [_iso(d) for d in days[:3]],
+                "areas": [{
+                    "area": {"name": "地域A", "code": area_code[:4] + "10"},
+                    "weatherCodes": [str(100 + i) for i in range(3)],
+                    "weathers": weathers[:3],
+                    "winds": ["北の風"] * 3,
+                }],
+            },
+            {
+                "timeDefines": [_iso(days[0], h) for h in (0, 6, 12, 18)],
+                "areas": [{
+                    "area": {"name": "地域A", "code": area_code[:4] + "10"},
+                    "pops": ["10", "20", "30", "40"],
+                }],
+            },
+            {
+                "timeDefines": [_iso(days[0], 9), _iso(days[0], 0),
+                                _iso(days[1], 0), _iso(days[1], 9)],
+                "areas": [{
+                    "area": {"name": "地点A", "code": "44132"},
+                    # 00時 = 朝の最低, 09時 = 日中の最高
+                    "temps": [str(seed % 10 + 8), str(seed % 10),
+                              str(seed % 10 + 1), str(seed % 10 + 9)],
+                }],
+            },
+        ],
+    }
+    weekly = {
+        "publishingOffice": "スタブ気象台",
+        "reportDatetime": report,
+        "timeSeries": [
+            {
+                "timeDefines": [_iso(d) for d in days],
+                "areas": [{
+                    "area": {"name": "地域A", "code": area_code},
+                    "weatherCodes": [str(100 + i) for i in range(7)],
+                    "pops": [""] + ["30"] * 6,
+                    "reliabilities": ["", ""] + ["A"] * 5,
+                }],
+            },
+            {
+                "timeDefines": [_iso(d) for d in days],
+                "areas": [{
+                    "area": {"name": "地点A", "code": "44132"},
+                    "tempsMin": [""] + [str(seed % 10 + i) for i in range(6)],
+                    "tempsMax": [""] + [str(seed % 10 + i + 8) for i in range(6)],
+                }],
+            },
+        ],
+    }
+    return [short, weekly]
+
+
+class StubJMAHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.calls += 1
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        path = self.path.split("?")[0]
+        if path == AREA_PATH:
+            data = make_area_json()
+        elif path.startswith(FORECAST_PATH) and path.endswith(".json"):
+            data = make_forecast(path[len(FORECAST_PATH):-len(".json")])
+        else:
+            self.send_error(404)
+            return
+
+        body = json.dumps(data, ensure_ascii=False).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(server.started, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 戻り値: (server, base_url)。使い終わったら server.shutdown()
+# 100 セッションが同時につなぎに来るので、受け付け待ちの列を広げる
+# （既定の 5 だと SYN があふれて再送待ちになり、クライアントが ReadTimeout になる）
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_stub_server(delay=0.0, port=0):
+    server = StubServer(("127.0.0.1", port), StubJMAHandler)
+    server.delay = delay
+    server.calls = 0
+    server.started = time.time()
+    server.lock = threading.Lock()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
@@ -0,0 +1,217 @@
+import sqlite3
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from rent_stats import (WALK_BINS, WALK_LABELS, init_stats, load_stats, summarize,
+                        walk_bucket)
+from snapshot import Snapshot
+
+# =====================
+# 分析（集計はできるだけ SQL 側でやる）
+#   ward / rent / walk_minutes に索引を張り、
+#   徒歩分数の区分け・区分ごとの平均・相関係数は SQL の集計で計算する
+#   → pandas に来るのは集計結果の数行だけ
+#   区だけで絞るとき（追加の条件なし）は集計表 property_stats から即答する
+#   snapshot_dir を渡すと snapshot.py で書き出した列ファイルから読む（DB は開かない）
+# =====================
+COLUMNS = ("name", "rent", "walk_minutes", "layout", "area", "age", "ward", "url")
+
+INDEXES = {
+    "idx_properties_ward_walk": "properties(ward, walk_minutes, rent)",
+    "idx_properties_walk_rent": "properties(walk_minutes, rent)",
+    "idx_properties_rent": "properties(rent)",
+}
+
+WALK_BUCKET = walk_bucket()
+
+
+class RealEstateAnalyzer:
+    # use_stats=False にすると常に properties を集計する
+    def __init__(self, db_path, use_stats=True, snapshot_dir=None):
+        self.db_path = db_path
+        self.use_stats = use_stats
+        self.snapshot = Snapshot(snapshot_dir) if snapshot_dir else None
+        if self.snapshot is None:
+            self.ensure_indexes()
+
+    def connect(self):
+        return sqlite3.connect(self.db_path)
+
+    # ANALYZE は数十万行で数百 ms かかるので、索引を作ったとき・統計が無いときだけ
+    def ensure_indexes(self):
+        conn = self.connect()
+        existing = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('index', 'table')"
+            )
+        }
+        with conn:
+            for name, target in INDEXES.items():
+                if name not in existing:
+                    conn.execute(f"CREATE INDEX {name} ON {target}")
+            if not INDEXES.keys() <= existing or "sqlite_stat1" not in existing:
+                conn.execute("ANALYZE")
+        init_stats(conn)
+        conn.close()
+
+    # データが大きく入れ替わったあとに呼ぶ（索引の統計を取り直す）
+    def analyze(self):
+        conn = self.connect()
+        with conn:
+            conn.execute("ANALYZE")
+        conn.close()
+
+    def _stats(self, ward):
+        conn = self.connect()
+        try:
+            return load_stats(conn, ward)
+        finally:
+            conn.close()
+
+    # ---------- WHERE 句の組み立て ----------
+    # 戻り値: (WHERE 句, パラメータ)
+    def _where(self, ward=None, min_rent=None, max_rent=None, max_walk=None):
+        conds = ["rent IS NOT NULL", "walk_minutes IS NOT NULL"]
+        params = []
+        if ward:
+            conds.append("ward = ?")
+            params.append(ward)
+        if min_rent is not None:
+            conds.append("rent >= ?")
+            params.append(min_rent)
+        if max_rent is not None:
+            conds.append("rent <= ?")
+            params.append(max_rent)
+        if max_walk is not None:
+            conds.append("walk_minutes <= ?")
+            params.append(max_walk)
+        return "WHERE " + " AND ".join(conds), params
+
+    def _query(self, sql, params):
+        conn = self.connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # ---------- 生データ（散布図用） ----------
+    # columns で必要な列だけ取る
+    def load_data(self, ward=None, columns=("rent", "walk_minutes"), **filters):
+        unknown = set(columns) - set(COLUMNS)
+        if self.snapshot:
+            unknown = set(columns) - set(self.snapshot.arrays)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}")
+        if self.snapshot:
+            return self.snapshot.load(columns, ward=ward, **filters)
+
+        where, params = self._where(ward, **filters)
+        conn = self.connect()
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM properties {where}", conn, params=params
+        )
+        conn.close()
+        return df
+
+    # ---------- 集計 ----------
+    def count(self, ward=None, **filters):
+        if self.snapshot:
+            return self.snapshot.count(ward=ward, **filters)
+        if self.use_stats and not filters:
+            return summarize(self._stats(ward)).n
+        where, params = self._where(ward, **filters)
+        return self._query(f"SELECT COUNT(*) FROM properties {where}", params)[0][0]
+
+    # 戻り値: 区分ごとの平均家賃（index は WALK_LABELS、該当なしは NaN）
+    def average_by_walk(self, ward=None, **filters):
+        if self.snapshot:
+            return self.snapshot.average_by_walk(ward=ward, **filters)
+        if self.use_stats and not filters:
+            rows = [(b, s.mean_rent) for b, s in self._stats(ward).items() if b >= 0]
+        else:
+            where, params = self._where(ward, **filters)
+            rows = self._query(f"""
+                SELECT {WALK_BUCKET} AS bucket, AVG(rent)
+                FROM properties
+                {where}
+                GROUP BY bucket
+                HAVING bucket >= 0
+            """, params)
+
+        avg = pd.Series(float("nan"), index=pd.CategoricalIndex(
+            WALK_LABELS, categories=WALK_LABELS, ordered=True, name="walk_cat"
+        ), name="rent")
+        for bucket, mean in rows:
+            avg.iloc[bucket] = mean
+        return avg
+
+    # ピアソンの相関係数。平均を引いてから掛けるので桁落ちしにくい
+    def correlation(self, ward=None, **filters):
+        if self.snapshot:
+            return self.snapshot.correlation(ward=ward, **filters)
+        if self.use_stats and not filters:
+            return summarize(self._stats(ward)).correlation()
+        where, params = self._where(ward, **filters)
+        (sxy, sxx, syy), = self._query(f"""
+            WITH m AS (
+                SELECT AVG(walk_minutes) AS mx, AVG(rent) AS my
+                FROM properties {where}
+            )
+            SELECT
+                SUM((walk_minutes - mx) * (rent - my)),
+                SUM((walk_minutes - mx) * (walk_minutes - mx)),
+                SUM((rent - my) * (rent - my))
+            FROM properties, m
+            {where}
+        """, params + params)
+
+        if not sxx or not syy:
+            return float("nan")
+        return sxy / (sxx * syy) ** 0.5
+
+    # ---------- グラフ ----------
+    def plot_scatter(self, df):
+        plt.figure()
+        plt.scatter(df["walk_minutes"], df["rent"])
+        plt.xlabel("Walk minutes from station")
+        plt.ylabel("Rent (yen)")
+        plt.title("Walk Minutes vs Rent")
+        plt.show()
+
+    # df を渡したときは従来どおり pandas で集計する
+    def plot_average_by_walk(self, df=None, ward=None):
+        if df is not None:
+            df = df.copy()
+            df["walk_cat"] = pd.cut(
+                df["walk_minutes"],
+                bins=WALK_BINS,
+                labels=WALK_LABELS
+            )
+            avg = df.groupby("walk_cat", observed=False)["rent"].mean()
+        else:
+            avg = self.average_by_walk(ward)
+
+        plt.figure()
+        avg.plot(kind="bar")
+        plt.xlabel("Walk minutes category")
+        plt.ylabel("Average rent (yen)")
+        plt.title("Average Rent by Walk Minutes")
+        plt.show()
+
+    def calc_correlation(self, df=None, ward=None):
+        if df is not None:
+            return df["walk_minutes"].corr(df["rent"])
+        return self.correlation(ward)
+
+
+if __name__ == "__main__":
+    analyzer = RealEstateAnalyzer("suumo.db")
+
+    # 世田谷区だけ分析（入力で変えられる）
+    ward = "世田谷区"
+
+    print(f"分析件数: {analyzer.count(ward)}")
+    print("相関係数:", analyzer.calc_correlation(ward=ward))
+
+    analyzer.plot_scatter(analyzer.load_data(ward=ward))
+    analyzer.plot_average_by_walk(ward=ward)
@@ -0,0 +1,85 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import scraper
+from analyzer import WALK_BINS, WALK_LABELS, RealEstateAnalyzer
+from fixture_server import WARD_NAMES
+from writer import UPSERT_PROPERTY
+
+N = 1_000_000
+WARDS = list(WARD_NAMES.values())
+
+
+def make_db(path, n, seed=0):
+    rnd = random.Random(seed)
+    scraper.DB_PATH = path
+    scraper.init_db()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(UPSERT_PROPERTY, (
+            (f"物件{i}", rnd.randint(5, 40), rnd.randint(1, 30), "1K",
+             rnd.randint(150, 800) / 10, rnd.randint(0, 50), rnd.choice(WARDS),
+             f"https://suumo.jp/chintai/jnc_{i:012d}/")
+            for i in range(n)
+        ))
+    conn.close()
+
+
+# 以前の流れ: 全行を DataFrame にしてから pandas で区分け・平均・相関
+def pandas_path(db_path, ward):
+    conn = sqlite3.connect(db_path)
+    query = """
+        SELECT rent, walk_minutes FROM properties
+        WHERE rent IS NOT NULL AND walk_minutes IS NOT NULL
+    """
+    if ward:
+        df = pd.read_sql_query(query + " AND ward = ?", conn, params=(ward,))
+    else:
+        df = pd.read_sql_query(query, conn)
+    conn.close()
+
+    df["walk_cat"] = pd.cut(df["walk_minutes"], bins=WALK_BINS, labels=WALK_LABELS)
+    avg = df.groupby("walk_cat", observed=False)["rent"].mean()
+    return avg, df["walk_minutes"].corr(df["rent"])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_analyzer(n=N):
+    print(f"== analyze {n:,} rows ==")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "analyze.db")
+        make_db(path, n)
+
+        _, t = timed(RealEstateAnalyzer, path)
+        print(f"create indexes + ANALYZE: {t:.2f} s")
+        pushdown = RealEstateAnalyzer(path, use_stats=False)
+        summary = RealEstateAnalyzer(path)
+
+        for ward in ("世田谷区", None):
+            (avg_old, corr_old), t_old = timed(pandas_path, path, ward)
+            label = ward or "全区"
+            line = f"{label:<6} pandas {t_old * 1000:8.1f} ms"
+
+            for name, analyzer in (("SQL", pushdown), ("stats table", summary)):
+                avg_new, t_avg = timed(analyzer.average_by_walk, ward)
+                corr_new, t_corr = timed(analyzer.correlation, ward)
+                assert np.allclose(avg_old.values, avg_new.values)
+                assert abs(corr_old - corr_new) < 1e-9
+                line += f" | {name} avg {t_avg * 1000:7.2f} ms + corr {t_corr * 1000:7.2f} ms"
+            print(f"{line}  (r = {corr_new:+.4f})")
+
+
+if __name__ == "__main__":
+    bench_analyzer(int(sys.argv[1]) if len(sys.argv) > 1 else N)
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import time
+
+import scraper
+from crawler import Crawler, crawl_wards
+from fixture_server import LIST_PATH, start_fixture_server
+
+
+# =====================
+# 逐次（notebook の main と同じ流れ、sleep の代わりに同じレート制限）
+# =====================
+def crawl_serial(base_url, pages, rate):
+    scraper.init_db()
+    interval = 1 / rate
+    for page in pages:
+        params = dict(scraper.PARAMS, page=page)
+        soup = scraper.get_soup(base_url + LIST_PATH, params)
+        for url in scraper.extract_detail_urls(soup, base_url):
+            time.sleep(interval)
+            data = scraper.extract_property_data(scraper.get_soup(url), url)
+            if data and data["rent"] and data["walk_minutes"]:
+                scraper.save_to_db(data)
+
+
+def count_rows():
+    import sqlite3
+    conn = sqlite3.connect(scraper.DB_PATH)
+    n = conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+    conn.close()
+    return n
+
+
+def bench_crawl(delay=0.1, pages=range(1, 4), per_page=20, rate=20.0):
+    server, base_url = start_fixture_server(delay=delay, per_page=per_page)
+    n = len(pages) * per_page
+    print(f"== crawl {n} detail pages (server delay {delay * 1000:.0f} ms, "
+          f"{rate:.0f} req/s limit) ==")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        scraper.DB_PATH = os.path.join(tmpdir, "serial.db")
+        start = time.perf_counter()
+        crawl_serial(base_url, pages, rate)
+        serial = time.perf_counter() - start
+        print(f"{'serial':<12} {serial:6.2f} s  ({n / serial:5.1f} pages/s, {count_rows()} rows)")
+
+        scraper.DB_PATH = os.path.join(tmpdir, "pipeline.db")
+        crawler = Crawler(rate=rate, fetch_workers=8, parse_workers=2,
+                          search_url=base_url + LIST_PATH, base_url=base_url)
+        stats = crawler.crawl(pages)
+        t = stats["elapsed"]
+        print(f"{'pipeline':<12} {t:6.2f} s  ({n / t:5.1f} pages/s, {count_rows()} rows)  {stats}")
+
+        # 2回目: frontier で既知の URL は取りに行かない
+        calls_before = server.calls
+        stats = Crawler(rate=rate, fetch_workers=8, parse_workers=2,
+                        search_url=base_url + LIST_PATH, base_url=base_url).crawl(pages)
+        print(f"{'re-crawl':<12} {stats['elapsed']:6.2f} s  ({server.calls - calls_before} requests, "
+              f"{count_rows()} rows)  {stats}")
+
+    server.shutdown()
+
+
+def bench_recrawl(delay=0.05, pages=range(1, 4), per_page=20, rate=50.0):
+    # 全ページ見直し: ETag あり（304）/ ETag なし（本文ハッシュで判定）
+    print(f"== conditional re-crawl of {len(pages) * per_page} detail pages ==")
+
+    for validators in (True, False):
+        server, base_url = start_fixture_server(
+            delay=delay, per_page=per_page, validators=validators
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            scraper.DB_PATH = os.path.join(tmpdir, "recrawl.db")
+
+            def crawl():
+                return Crawler(rate=rate, fetch_workers=8, parse_workers=2,
+                               search_url=base_url + LIST_PATH, base_url=base_url,
+                               recheck_after=0).crawl(pages)
+
+            first = crawl()
+            # 5件だけ掲載内容を変える
+            for no in range(5):
+                server.revisions[f"13112001{no:04d}"] = 1
+            second = crawl()
+
+            label = "etag" if validators else "hash only"
+            print(f"{label:<10} first {first['bytes']:>8,} B, parsed {first['parsed']} | "
+                  f"re-crawl {second['bytes']:>8,} B, parsed {second['parsed']}, "
+                  f"not_modified {second['not_modified']}, unchanged {second['unchanged']}, "
+                  f"written {second['written']}")
+        server.shutdown()
+
+
+def bench_wards(delay=0.1, pages=range(1, 3), per_page=10, rate=60.0):
+    # 23区 × pages、プロセス数を変えても合計レートは rate 回/秒まで
+    server, base_url = start_fixture_server(delay=delay, pages=len(pages), per_page=per_page)
+    print(f"== 23 wards x {len(pages)} pages x {per_page} (shared limit {rate:.0f} req/s) ==")
+
+    for processes in (1, 4):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            scraper.DB_PATH = os.path.join(tmpdir, "wards.db")
+            calls_before = server.calls
+            start = time.perf_counter()
+            metrics = crawl_wards(processes=processes, rate=rate, pages=pages,
+                                  db_path=scraper.DB_PATH,
+                                  fetch_workers=4, parse_workers=1,
+                                  search_url=base_url + LIST_PATH, base_url=base_url)
+            t = time.perf_counter() - start
+            calls = server.calls - calls_before
+
+            import sqlite3
+            conn = sqlite3.connect(scraper.DB_PATH)
+            rows, wards = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT ward) FROM properties"
+            ).fetchone()
+            conn.close()
+            print(f"processes={processes}: {t:6.2f} s, {calls} requests "
+                  f"({calls / t:5.1f} req/s), {rows} rows in {wards} wards, "
+                  f"{len(metrics)} shards\n")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    bench_crawl()
+    bench_recrawl()
+    bench_wards()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+from fast_parser import BACKENDS, parse_property
+from fixture_server import render_detail
+from scraper import extract_property_data
+
+
+# 雛形から詳細ページを書き出して、それを読み直したものを対象にする
+def build_corpus(tmpdir, n):
+    paths = []
+    for i in range(n):
+        path = os.path.join(tmpdir, f"detail_{i:04d}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_detail(f"13112{i // 100:03d}{i % 100:04d}"))
+        paths.append(path)
+
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            corpus.append((f.read(), path))
+    return corpus
+
+
+def run(label, func, corpus):
+    start = time.perf_counter()
+    results = [func(html, url) for html, url in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(corpus) / elapsed:8.0f} pages/s")
+    return results, elapsed
+
+
+def bench_parser(n=500):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        corpus = build_corpus(tmpdir, n)
+        print(f"== parse {n} fixture pages ==")
+
+        base, t0 = run(
+            "extract_property_data (bs4)",
+            lambda html, url: extract_property_data(BeautifulSoup(html, "html.parser"), url),
+            corpus,
+        )
+        for backend in BACKENDS:
+            results, t = run(
+                f"parse_property ({backend})",
+                lambda html, url: parse_property(html, url, backend),
+                corpus,
+            )
+            same = all(
+                r[k] == b[k]
+                for r, b in zip(results, base)
+                for k in ("name", "rent", "walk_minutes", "layout")
+            )
+            filled = sum(r["area"] is not None for r in results)
+            print(f"  {t0 / t:5.1f}x faster, same fields: {same}, area filled: {filled}/{n}")
+
+
+if __name__ == "__main__":
+    bench_parser()
@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from analyzer import RealEstateAnalyzer
+from bench_analyzer import make_db
+from snapshot import export_snapshot
+
+N = 1_000_000
+COLUMNS = ("rent", "walk_minutes", "ward", "layout", "age", "area")
+
+
+def _rss_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+
+# 別プロセスで1回だけ読み込み、時間と最大 RSS の増分を返す（Linux の /proc を使う）
+def measure(mode, db_path, snapshot_dir):
+    import numpy as np
+
+    if mode == "sqlite":
+        analyzer = RealEstateAnalyzer(db_path, use_stats=False)
+    else:
+        analyzer = RealEstateAnalyzer(db_path, snapshot_dir=snapshot_dir)
+
+    # 最大 RSS（VmHWM）を今の RSS に戻してから測る
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    base = _rss_kb("VmRSS")
+    start = time.perf_counter()
+    df = analyzer.load_data(columns=COLUMNS)
+    # 読んだ列を実際に使う（memmap のページもここで触る）
+    checksum = int(np.asarray(df["rent"], dtype=np.int64).sum())
+    elapsed = time.perf_counter() - start
+    peak = _rss_kb("VmHWM")
+
+    print(json.dumps({
+        "rows": len(df),
+        "seconds": elapsed,
+        "rss_mb": (peak - base) / 1024,
+        "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+        "checksum": checksum,
+    }))
+
+
+def run(mode, db_path, snapshot_dir):
+    out = subprocess.run(
+        [sys.executable, __file__, "measure", mode, db_path, snapshot_dir],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def bench_snapshot(n=N):
+    print(f"== load {n:,} rows x {len(COLUMNS)} columns ==")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "suumo.db")
+        snapshot_dir = os.path.join(tmpdir, "snapshot")
+        make_db(db_path, n)
+        RealEstateAnalyzer(db_path)  # 索引・集計表は先に作っておく
+
+        start = time.perf_counter()
+        export_snapshot(db_path, snapshot_dir)
+        size = sum(os.path.getsize(os.path.join(snapshot_dir, f))
+                   for f in os.listdir(snapshot_dir))
+        print(f"export {time.perf_counter() - start:.2f} s, {size / 2**20:.1f} MB on disk "
+              f"(suumo.db {os.path.getsize(db_path) / 2**20:.1f} MB)")
+
+        results = {mode: run(mode, db_path, snapshot_dir) for mode in ("sqlite", "snapshot")}
+        assert results["sqlite"]["checksum"] == results["snapshot"]["checksum"]
+        for mode, r in results.items():
+            print(f"{mode:<9} {r['seconds'] * 1000:8.1f} ms  peak RSS +{r['rss_mb']:7.1f} MB  "
+                  f"DataFrame {r['frame_mb']:6.1f} MB  ({r['rows']:,} rows)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["measure"]:
+        measure(*sys.argv[2:5])
+    else:
+        bench_snapshot(int(sys.argv[1]) if len(sys.argv) > 1 else N)
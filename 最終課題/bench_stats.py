@@ -0,0 +1,124 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import scraper
+from analyzer import RealEstateAnalyzer
+from bench_analyzer import WARDS
+from rent_stats import (TRIGGERS, WALK_BINS, WALK_LABELS, load_stats, rebuild_stats,
+                        summarize)
+from writer import PropertyWriter
+
+N = 200_000
+
+
+def make_records(n, seed=0, url_range=None):
+    rnd = random.Random(seed)
+    url_range = url_range or n
+    return [
+        {
+            "name": f"物件{i}",
+            "rent": rnd.randint(5, 40),
+            "walk_minutes": rnd.choice([rnd.randint(1, 30), rnd.randint(1, 90)]),
+            "layout": "1K",
+            "area": rnd.randint(150, 800) / 10,
+            "age": rnd.randint(0, 50),
+            "ward": rnd.choice(WARDS),
+            "url": f"https://suumo.jp/chintai/jnc_{rnd.randrange(url_range):012d}/",
+        }
+        for i in range(n)
+    ]
+
+
+def write(path, records, triggers=True):
+    scraper.DB_PATH = path
+    scraper.init_db()
+    if not triggers:
+        conn = sqlite3.connect(path)
+        for name in TRIGGERS:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.close()
+
+    start = time.perf_counter()
+    with PropertyWriter(path, batch_size=5000) as writer:
+        for data in records:
+            writer.add(data)
+    return time.perf_counter() - start
+
+
+# pandas で全件から計算した値
+def pandas_values(path, ward=None):
+    conn = sqlite3.connect(path)
+    df = pd.read_sql_query(
+        "SELECT ward, rent, walk_minutes FROM properties "
+        "WHERE rent IS NOT NULL AND walk_minutes IS NOT NULL", conn
+    )
+    conn.close()
+    if ward:
+        df = df[df["ward"] == ward]
+    cats = pd.cut(df["walk_minutes"], bins=WALK_BINS, labels=WALK_LABELS)
+    avg = df.groupby(cats, observed=False)["rent"].mean()
+    return len(df), avg, df["walk_minutes"].corr(df["rent"])
+
+
+def check(path, label):
+    analyzer = RealEstateAnalyzer(path)
+    for ward in (None, WARDS[0], WARDS[-1]):
+        n, avg, corr = pandas_values(path, ward)
+        assert analyzer.count(ward) == n, (label, ward)
+        assert np.allclose(analyzer.average_by_walk(ward).values, avg.values,
+                           equal_nan=True), (label, ward)
+        assert abs(analyzer.correlation(ward) - corr) < 1e-9, (label, ward)
+    print(f"{label:<30} matches pandas (count / bucket means / correlation)")
+
+
+def bench_stats(n=N):
+    print(f"== incremental stats, {n:,} writes ==")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # url が重なるので後の書き込みは UPDATE（区・家賃・徒歩が変わる）になる
+        records = make_records(n, url_range=n // 2)
+
+        t_plain = write(os.path.join(tmpdir, "plain.db"), records, triggers=False)
+        path = os.path.join(tmpdir, "stats.db")
+        t_stats = write(path, records)
+        print(f"writer without triggers {t_plain:6.2f} s | with triggers {t_stats:6.2f} s")
+        check(path, "after inserts + upserts")
+
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("DELETE FROM properties WHERE id % 7 = 0")
+            conn.execute("UPDATE properties SET rent = NULL WHERE id % 11 = 0")
+        conn.close()
+        check(path, "after deletes + NULL updates")
+
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        rebuild_stats(conn)
+        t_rebuild = time.perf_counter() - start
+        conn.close()
+        check(path, "after rebuild")
+
+        # 件数によらない: 集計表の行数は 区 × 区分 だけ
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        for _ in range(1000):
+            total = summarize(load_stats(conn))
+        t_query = (time.perf_counter() - start) / 1000
+        rows = conn.execute("SELECT COUNT(*) FROM property_stats").fetchone()[0]
+        conn.close()
+
+        start = time.perf_counter()
+        pandas_values(path)
+        t_pandas = time.perf_counter() - start
+        print(f"rebuild {t_rebuild * 1000:.0f} ms | summary query {t_query * 1000:.3f} ms "
+              f"({rows} stats rows, {total.n:,} properties) vs pandas {t_pandas * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    bench_stats(int(sys.argv[1]) if len(sys.argv) > 1 else N)
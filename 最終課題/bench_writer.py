@@ -0,0 +1,73 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import scraper
+from writer import PropertyWriter
+
+N = 100_000
+LAYOUTS = ["ワンルーム", "1K", "1DK", "1LDK", "2DK", "2LDK", "3LDK"]
+
+
+def make_records(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "name": f"物件{i}",
+            "rent": rnd.randint(5, 40),
+            "walk_minutes": rnd.randint(1, 30),
+            "layout": rnd.choice(LAYOUTS),
+            "area": rnd.randint(150, 800) / 10,
+            "age": rnd.randint(0, 50),
+            "ward": "世田谷区",
+            "url": f"https://suumo.jp/chintai/jnc_{i:012d}/",
+        }
+        for i in range(n)
+    ]
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    n = conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+    conn.close()
+    return n
+
+
+def bench_writer(n=N):
+    records = make_records(n)
+    print(f"== save {n:,} records ==")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        scraper.DB_PATH = os.path.join(tmpdir, "per_row.db")
+        scraper.init_db()
+        start = time.perf_counter()
+        for data in records:
+            scraper.save_to_db(data)
+        per_row = time.perf_counter() - start
+        print(f"{'save_to_db per row':<24} {per_row:7.2f} s  "
+              f"({n / per_row:9,.0f} rows/s, {count_rows(scraper.DB_PATH):,} rows)")
+
+        scraper.DB_PATH = os.path.join(tmpdir, "batched.db")
+        scraper.init_db()
+        start = time.perf_counter()
+        with PropertyWriter(scraper.DB_PATH) as writer:
+            for data in records:
+                writer.add(data)
+        batched = time.perf_counter() - start
+        print(f"{'PropertyWriter':<24} {batched:7.2f} s  "
+              f"({n / batched:9,.0f} rows/s, {count_rows(scraper.DB_PATH):,} rows)")
+        print(f"speedup: {per_row / batched:.0f}x")
+
+        # 同じ内容の再投入は書き込みなし、家賃が変わった分だけ更新
+        for data in records[::10]:
+            data["rent"] += 1
+        with PropertyWriter(scraper.DB_PATH) as writer:
+            for data in records:
+                writer.add(data)
+        print(f"re-save with 10% changed: {writer.written:,} rows updated")
+
+
+if __name__ == "__main__":
+    bench_writer()
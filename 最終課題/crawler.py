@@ -0,0 +1,386 @@
+import hashlib
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import scraper
+from fast_parser import parse_detail_urls, parse_property
+from frontier import Frontier
+from scraper import BASE_URL, HEADERS, PARAMS, SEARCH_URL, WARD_CODES, init_db
+from writer import PropertyWriter
+
+# =====================
+# トークンバケット（1秒あたり rate 回まで、burst 回までの連続は許す）
+# =====================
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+# =====================
+# 複数プロセスで共有するレート制限
+#   次に送ってよい時刻を共有メモリに1つだけ持ち、取った人が 1/rate 秒ずらす
+#   → プロセスがいくつあっても合計で rate 回/秒まで
+# =====================
+class SharedTokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.next_slot = multiprocessing.Value("d", 0.0)
+
+    def acquire(self):
+        with self.next_slot.get_lock():
+            now = time.time()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# =====================
+# 解析（プロセスプールで動かすのでモジュール直下の関数にしておく）
+# =====================
+def parse_detail(html, url):
+    return parse_property(html, url)
+
+
+def parse_list(html, base_url):
+    return parse_detail_urls(html, base_url)
+
+
+# =====================
+# 取得 → 解析 → 保存 のパイプライン
+#   取得: スレッドプール（全体で rate 回/秒まで、Session で keep-alive）
+#   解析: プロセスプール（通信待ちの間に BeautifulSoup を回す）
+#   保存: 専用スレッド1本 → PropertyWriter でまとめ書き
+# =====================
+class Crawler:
+    # recheck_after: 取得済みページをこの秒数が経ったら条件付き GET で見直す
+    # bucket: 他のプロセスとレート制限を共有するときに SharedTokenBucket を渡す
+    # db_path: 省略時は scraper.DB_PATH（子プロセスからは明示して渡す）
+    def __init__(self, rate=1.0, fetch_workers=4, parse_workers=2,
+                 search_url=SEARCH_URL, base_url=BASE_URL, params=None,
+                 recheck_after=None, bucket=None, verbose=True, db_path=None):
+        self.db_path = db_path or scraper.DB_PATH
+        self.bucket = bucket or TokenBucket(rate)
+        self.verbose = verbose
+        self.recheck_after = recheck_after
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.search_url = search_url
+        self.base_url = base_url
+        self.params = dict(PARAMS if params is None else params)
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_maxsize=fetch_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.frontier = None
+        self.writer = None
+        self.stats = {"fetched": 0, "parsed": 0, "saved": 0, "failed": 0,
+                      "skipped": 0, "not_modified": 0, "unchanged": 0,
+                      "bytes": 0}
+        self._stats_lock = threading.Lock()
+        self._store_queue = queue.Queue()
+        # 保存待ちの url → (etag, last_modified, content_hash)
+        # 書き込みがコミットされるまで frontier は fetched にしない
+        self._unsaved = {}
+        self._unsaved_lock = threading.Lock()
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def get(self, url, params=None, headers=None):
+        self.bucket.acquire()
+        res = self.session.get(url, params=params, headers=headers, timeout=10)
+        self._count("bytes", len(res.content))
+        if res.status_code != 304:
+            res.raise_for_status()
+        self._count("fetched")
+        return res
+
+    def fetch(self, url, params=None):
+        return self.get(url, params).text
+
+    # ---------- 保存 ----------
+    def save(self, data):
+        self.writer.add(data)
+
+    def _store_loop(self):
+        while True:
+            data = self._store_queue.get()
+            if data is None:
+                return
+            try:
+                self.save(data)
+                self._count("saved")
+            except Exception as e:
+                print("保存失敗:", data.get("url"), e)
+                with self._unsaved_lock:
+                    self._unsaved.pop(data["url"], None)
+                self.frontier.mark_failed(data["url"], e)
+                self._count("failed")
+
+    # PropertyWriter がコミットし終わった url だけ fetched にする
+    # （ここより前に落ちたら、次回はその url を取り直す）
+    def _on_flushed(self, urls):
+        for url in urls:
+            with self._unsaved_lock:
+                validators = self._unsaved.pop(url, None)
+            if validators is not None:
+                self.frontier.mark_fetched(url, *validators)
+
+    # ---------- 解析 → 保存 ----------
+    def _on_parsed(self, url, validators, future):
+        try:
+            data = future.result()
+            self._count("parsed")
+            if data and data["rent"] and data["walk_minutes"]:
+                with self._unsaved_lock:
+                    self._unsaved[url] = validators
+                self._store_queue.put(data)
+            else:
+                # 保存するものがない → この時点で取得済み
+                self.frontier.mark_fetched(url, *validators)
+        except Exception as e:
+            print("解析失敗:", url, e)
+            self.frontier.mark_failed(url, e)
+            self._count("failed")
+        finally:
+            with self._pending_cond:
+                self._pending -= 1
+                self._pending_cond.notify_all()
+
+    # ---------- 取得 → 解析 ----------
+    def _fetch_detail(self, url, parse_pool):
+        etag, last_modified, old_hash = self.frontier.validators(url)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        try:
+            res = self.get(url, headers=headers)
+        except requests.RequestException as e:
+            print("取得失敗:", url, e)
+            self.frontier.mark_failed(url, e)
+            self._count("failed")
+            return
+
+        # 304 → 本文も来ない。解析もしない
+        if res.status_code == 304:
+            self.frontier.mark_fetched(url)
+            self._count("not_modified")
+            return
+
+        validators = (
+            res.headers.get("ETag"),
+            res.headers.get("Last-Modified"),
+            hashlib.sha1(res.content).hexdigest(),
+        )
+
+        # 本文が前回と同じ → 解析・保存は不要
+        if validators[2] == old_hash:
+            self.frontier.mark_fetched(url, *validators)
+            self._count("unchanged")
+            return
+
+        with self._pending_cond:
+            self._pending += 1
+        parse_pool.submit(parse_detail, res.text, url).add_done_callback(
+            lambda f: self._on_parsed(url, validators, f)
+        )
+
+    # 一覧で見つけた URL のうち、frontier 上で取りに行くべきものだけ投げる
+    def _submit(self, urls, submitted, fetch_pool, parse_pool, futures):
+        for url in self.frontier.due(urls, source=self.params.get("sc")):
+            if url in submitted:
+                continue
+            submitted.add(url)
+            futures.append(fetch_pool.submit(self._fetch_detail, url, parse_pool))
+
+    def crawl(self, pages=range(1, 6)):
+        init_db(self.db_path)
+        self.frontier = Frontier(self.db_path, recheck_after=self.recheck_after)
+        self.writer = PropertyWriter(self.db_path, on_flush=self._on_flushed)
+        start = time.perf_counter()
+
+        store_thread = threading.Thread(target=self._store_loop, daemon=True)
+        store_thread.start()
+
+        with ProcessPoolExecutor(self.parse_workers) as parse_pool, \
+                ThreadPoolExecutor(self.fetch_workers) as fetch_pool:
+            fetch_futures = []
+            submitted = set()
+
+            for page in pages:
+                params = dict(self.params, page=page)
+                try:
+                    html = self.fetch(self.search_url, params)
+                except requests.RequestException as e:
+                    print(f"一覧取得失敗: page {page}", e)
+                    self._count("failed")
+                    continue
+
+                detail_urls = parse_list(html, self.base_url)
+                new = self.frontier.add(detail_urls, source=self.params.get("sc"))
+                before = len(fetch_futures)
+                self._submit(detail_urls, submitted, fetch_pool, parse_pool, fetch_futures)
+                queued = len(fetch_futures) - before
+
+                with self._stats_lock:
+                    self.stats["skipped"] += len(detail_urls) - queued
+                if self.verbose:
+                    print(f"--- page {page} --- 物件数: {len(detail_urls)} "
+                          f"(新規 {new}, 取得 {queued})")
+
+            # 前回途中で止まった分・再試行の時刻が来た分
+            self._submit(None, submitted, fetch_pool, parse_pool, fetch_futures)
+
+            for f in fetch_futures:
+                f.result()
+
+            # 解析待ちがすべて保存キューに入るまで待つ
+            with self._pending_cond:
+                self._pending_cond.wait_for(lambda: self._pending == 0)
+
+        self._store_queue.put(None)
+        store_thread.join()
+        self.writer.close()
+        self.stats["written"] = self.writer.written
+
+        self.stats["frontier"] = self.frontier.counts()
+        self.frontier.close()
+        self.stats["elapsed"] = time.perf_counter() - start
+        return self.stats
+
+
+# =====================
+# 23区まとめてクロール
+#   区コードを processes 個のシャードに振り分け、シャードごとに1プロセス
+#   レート制限は全シャードで共有、結果はすべて同じ suumo.db に書く（WAL）
+#   各区が終わるたびに進捗を親プロセスへ送る
+# =====================
+def _crawl_shard(shard, wards, bucket, progress, pages, db_path, crawler_kwargs):
+    totals = {"wards": 0, "fetched": 0, "parsed": 0, "written": 0, "failed": 0,
+              "error": None}
+    start = time.perf_counter()
+
+    # 途中で例外が出ても "done" は必ず送る（送らないと親が待ち続ける）
+    try:
+        base_params = crawler_kwargs.pop("params", None) or PARAMS
+        for ward in wards:
+            params = dict(base_params, sc=ward)
+            crawler = Crawler(params=params, bucket=bucket, verbose=False, db_path=db_path,
+                              **crawler_kwargs)
+            stats = crawler.crawl(pages)
+
+            totals["wards"] += 1
+            for key in ("fetched", "parsed", "written", "failed"):
+                totals[key] += stats[key]
+            progress.put(("ward", shard, ward, stats))
+    except Exception as e:
+        totals["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        totals["elapsed"] = time.perf_counter() - start
+        progress.put(("done", shard, None, totals))
+
+
+PROGRESS_POLL = 1.0  # 進捗が来ないときにシャードの生死を見る間隔（秒）
+
+
+# db_path は子プロセスへ引数で渡す（spawn だと子は scraper を読み直すので
+# 親で書き換えた scraper.DB_PATH は届かない）
+def crawl_wards(ward_codes=WARD_CODES, processes=4, rate=1.0, pages=range(1, 6),
+                db_path=None, **crawler_kwargs):
+    db_path = db_path or scraper.DB_PATH
+    init_db(db_path)  # 一意インデックスの作成が競合しないよう、先に親で済ませる
+    shards = [ward_codes[i::processes] for i in range(processes)]
+    shards = [wards for wards in shards if wards]
+
+    bucket = SharedTokenBucket(rate)
+    progress = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=_crawl_shard,
+            args=(shard, wards, bucket, progress, pages, db_path, crawler_kwargs),
+        )
+        for shard, wards in enumerate(shards)
+    ]
+
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+
+    # 戻り値: {shard: {"wards", "fetched", "parsed", "written", "failed", "elapsed", "error"}}
+    metrics = {}
+    while len(metrics) < len(workers):
+        try:
+            kind, shard, ward, stats = progress.get(timeout=PROGRESS_POLL)
+        except queue.Empty:
+            # "done" を送れずに終わったシャード（強制終了など）は待たずに失敗として数える
+            # （終わる直前に送った "done" がまだ届いていないだけなら次の get で受け取る）
+            for shard, w in enumerate(workers):
+                if shard not in metrics and not w.is_alive() and progress.empty():
+                    metrics[shard] = {
+                        "wards": 0, "fetched": 0, "parsed": 0, "written": 0, "failed": 0,
+                        "elapsed": time.perf_counter() - start,
+                        "error": f"exit code {w.exitcode}",
+                    }
+                    print(f"[shard {shard}] 異常終了: exit code {w.exitcode}")
+            continue
+
+        elapsed = time.perf_counter() - start
+        if kind == "ward":
+            print(f"[shard {shard}] {ward}: {stats['fetched']} 取得, "
+                  f"{stats['written']} 件保存 ({stats['elapsed']:.1f} s)")
+        else:
+            metrics[shard] = stats
+            rate_text = stats["fetched"] / stats["elapsed"] if stats["elapsed"] else 0.0
+            print(f"[shard {shard}] 完了: {stats['wards']} 区, {stats['fetched']} 取得 "
+                  f"({rate_text:.1f} pages/s), "
+                  f"{stats['written']} 件保存, 失敗 {stats['failed']}  [{elapsed:.1f} s]")
+            if stats["error"]:
+                print(f"[shard {shard}] エラーで中断: {stats['error']}")
+
+    for w in workers:
+        w.join()
+    return metrics
+
+
+if __name__ == "__main__":
+    # python crawler.py wards [processes]  → 23区まとめて
+    if sys.argv[1:2] == ["wards"]:
+        crawl_wards(processes=int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    else:
+        print(Crawler().crawl())
@@ -0,0 +1,159 @@
+import re
+from urllib.parse import urljoin
+
+# =====================
+# 詳細ページの高速解析
+#   使えるものを上から順に使う: selectolax → lxml → BeautifulSoup
+#   家賃・徒歩・間取り・面積・築年数・区を1回の走査でまとめて取り出す
+# =====================
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+from bs4 import BeautifulSoup
+
+from scraper import parse_ward
+
+INT_RE = re.compile(r"\d+")
+WALK_RE = re.compile(r"徒歩\s*(\d+)\s*分")
+AREA_RE = re.compile(r"\d+(?:\.\d+)?")
+
+BACKENDS = [
+    name for name, ok in (
+        ("selectolax", HTMLParser is not None),
+        ("lxml", lxml is not None),
+        ("bs4", True),
+    ) if ok
+]
+DEFAULT_BACKEND = BACKENDS[0]
+
+
+def _int(text):
+    if text is None:
+        return None
+    m = INT_RE.search(text)
+    return int(m.group()) if m else None
+
+
+def _walk_minutes(html):
+    # 徒歩 N 分 は HTML 文字列に対して正規表現を1回かけるだけで拾える
+    minutes = [int(m) for m in WALK_RE.findall(html)]
+    return min(minutes) if minutes else None
+
+
+def _fill_table(record, pairs):
+    for label, value in pairs:
+        if label == "間取り":
+            record["layout"] = value
+        elif label == "専有面積":
+            m = AREA_RE.search(value)
+            record["area"] = float(m.group()) if m else None
+        elif label == "築年数":
+            record["age"] = _int(value)
+        elif label == "所在地":
+            record["ward"] = parse_ward(value)
+
+
+# ---------- backend ごとの th/td の取り出し ----------
+# 1行に th/td が2組並ぶ行もあるので、th ごとに直後の td と組にする
+def _parse_selectolax(html):
+    tree = HTMLParser(html)
+    h1 = tree.css_first("h1")
+    rent = tree.css_first("span.property_view_note-emphasis")
+    pairs = []
+    for th in tree.css("table.property_view_table th"):
+        td = th.next
+        while td is not None and td.tag != "td":
+            td = td.next
+        if td is not None:
+            pairs.append((th.text(strip=True), td.text(strip=True)))
+    return (
+        h1.text(strip=True) if h1 else None,
+        rent.text() if rent else None,
+        pairs,
+    )
+
+
+def _parse_lxml(html):
+    tree = lxml.html.fromstring(html)
+    h1 = tree.find(".//h1")
+    rent = tree.xpath('//span[contains(concat(" ", @class, " "), " property_view_note-emphasis ")]')
+    pairs = []
+    for th in tree.xpath('//table[contains(@class, "property_view_table")]//th'):
+        td = th.getnext()
+        while td is not None and td.tag != "td":
+            td = td.getnext()
+        if td is not None:
+            pairs.append((th.text_content().strip(), td.text_content().strip()))
+    return (
+        h1.text_content().strip() if h1 is not None else None,
+        rent[0].text_content() if rent else None,
+        pairs,
+    )
+
+
+def _parse_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    h1 = soup.find("h1")
+    rent = soup.find("span", class_="property_view_note-emphasis")
+    pairs = []
+    for th in soup.select("table.property_view_table th"):
+        td = th.find_next_sibling("td")
+        if td is not None:
+            pairs.append((th.get_text(strip=True), td.get_text(strip=True)))
+    return (
+        h1.get_text(strip=True) if h1 else None,
+        rent.get_text() if rent else None,
+        pairs,
+    )
+
+
+PARSERS = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "bs4": _parse_bs4,
+}
+
+
+def parse_property(html, url, backend=None):
+    try:
+        name, rent_text, pairs = PARSERS[backend or DEFAULT_BACKEND](html)
+        record = {
+            "name": name,
+            "rent": _int(rent_text),
+            "walk_minutes": _walk_minutes(html),
+            "layout": None,
+            "area": None,
+            "age": None,
+            "ward": None,
+            "url": url,
+        }
+        _fill_table(record, pairs)
+        return record
+
+    except Exception as e:
+        print("解析失敗:", url, e)
+        return None
+
+
+# 一覧ページの詳細URL（a.js-cassette_link_href）
+LINK_RE = re.compile(r'<a\b[^>]*class="[^"]*\bjs-cassette_link_href\b[^"]*"[^>]*>')
+HREF_RE = re.compile(r'href="([^"]+)"')
+
+
+def parse_detail_urls(html, base_url):
+    urls = set()
+    for tag in LINK_RE.findall(html):
+        m = HREF_RE.search(tag)
+        if m:
+            urls.add(urljoin(base_url, m.group(1).replace("&amp;", "&")))
+    return list(urls)
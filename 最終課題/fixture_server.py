@@ -0,0 +1,154 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+# =====================
+# SUUMO のスタブ（保存した HTML 雛形を返すだけ）
+#   一覧: /jj/chintai/ichiran/FR301FC001/?sc=13112&page=1
+#   詳細: /chintai/jnc_<ward><page><no>/
+# =====================
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LIST_PATH = "/jj/chintai/ichiran/FR301FC001/"
+DETAIL_PREFIX = "/chintai/jnc_"
+
+WARD_NAMES = {
+    "13101": "千代田区", "13102": "中央区", "13103": "港区", "13104": "新宿区",
+    "13105": "文京区", "13106": "台東区", "13107": "墨田区", "13108": "江東区",
+    "13109": "品川区", "13110": "目黒区", "13111": "大田区", "13112": "世田谷区",
+    "13113": "渋谷区", "13114": "中野区", "13115": "杉並区", "13116": "豊島区",
+    "13117": "北区", "13118": "荒川区", "13119": "板橋区", "13120": "練馬区",
+    "13121": "足立区", "13122": "葛飾区", "13123": "江戸川区",
+}
+
+LAYOUTS = ["ワンルーム", "1K", "1DK", "1LDK", "2DK", "2LDK", "3LDK"]
+STATIONS = [("東急田園都市線", "三軒茶屋"), ("小田急線", "経堂"),
+            ("京王線", "明大前"), ("東急世田谷線", "松陰神社前")]
+
+
+def _template(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+LIST_TEMPLATE = _template("list.html")
+ITEM_TEMPLATE = _template("list_item.html")
+DETAIL_TEMPLATE = _template("detail.html")
+
+
+def property_values(bukken_id):
+    rnd = random.Random(bukken_id)
+    ward = bukken_id[:5]
+    line, station = rnd.choice(STATIONS)
+    line2, station2 = rnd.choice(STATIONS)
+    walk = rnd.randint(1, 25)
+    return {
+        "bukken_id": bukken_id,
+        "name": f"スタブハイツ{bukken_id[-4:]}",
+        "ward_name": WARD_NAMES.get(ward, "世田谷区"),
+        "town": f"{rnd.randint(1, 5)}丁目",
+        "rent_man": f"{rnd.randint(50, 250) / 10:.1f}",
+        "line": line, "station": station, "walk_minutes": walk,
+        "line2": line2, "station2": station2, "walk_minutes2": walk + rnd.randint(1, 10),
+        "layout": rnd.choice(LAYOUTS),
+        "area": f"{rnd.randint(150, 800) / 10:.1f}",
+        "age": rnd.randint(0, 50),
+        "surroundings": "\n".join(
+            f"    <p>スーパー{i}まで {rnd.randint(100, 900)}m</p>" for i in range(30)
+        ),
+    }
+
+
+# revision を上げると家賃が変わる（掲載内容の更新を再現する）
+def render_detail(bukken_id, revision=0):
+    values = property_values(bukken_id)
+    if revision:
+        values["rent_man"] = f"{float(values['rent_man']) + revision:.1f}"
+    return DETAIL_TEMPLATE.substitute(values)
+
+
+def render_list(ward, page, per_page):
+    items = []
+    for no in range(per_page):
+        bukken_id = f"{ward}{page:03d}{no:04d}"
+        values = property_values(bukken_id)
+        values["href"] = f"{DETAIL_PREFIX}{bukken_id}/"
+        items.append(ITEM_TEMPLATE.substitute(values))
+    return LIST_TEMPLATE.substitute(
+        ward_name=WARD_NAMES.get(ward, ""), page=page, items="\n".join(items)
+    )
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.calls += 1
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        url = urlparse(self.path)
+        if url.path == LIST_PATH:
+            query = parse_qs(url.query)
+            ward = query.get("sc", ["13112"])[0]
+            page = int(query.get("page", ["1"])[0])
+            per_page = server.per_page if page <= server.pages else 0
+            body = render_list(ward, page, per_page)
+        elif url.path.startswith(DETAIL_PREFIX):
+            bukken_id = url.path[len(DETAIL_PREFIX):].strip("/")
+            body = render_detail(bukken_id, server.revisions.get(bukken_id, 0))
+        else:
+            self.send_error(404)
+            return
+
+        data = body.encode("utf-8")
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+
+        # ETag / Last-Modified は server.validators が True のときだけ返す
+        if server.validators:
+            etag = '"' + hashlib.md5(data).hexdigest() + '"'
+            headers["ETag"] = etag
+            headers["Last-Modified"] = formatdate(server.started, usegmt=True)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 戻り値: (server, base_url)。使い終わったら server.shutdown()
+def start_fixture_server(delay=0.0, pages=5, per_page=20, validators=True, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.pages = pages
+    server.per_page = per_page
+    server.validators = validators
+    server.revisions = {}
+    server.started = time.time()
+    server.calls = 0
+    server.lock = threading.Lock()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+
+# =====================
+# クロールの frontier（URL ごとの状態を suumo.db に残す）
+#   queued  : 見つけたがまだ取っていない（落ちても次回ここから再開）
+#   fetched : 取得・解析済み → 次回以降は取りに行かない
+#   failed  : 失敗。next_attempt_at を過ぎたら max_attempts 回まで再試行
+# 取得済みページの ETag / Last-Modified / 本文ハッシュも持っておき、
+# 再クロールでは条件付き GET と「中身が同じなら解析しない」に使う
+# =====================
+QUEUED = "queued"
+FETCHED = "fetched"
+FAILED = "failed"
+
+
+class Frontier:
+    def __init__(self, db_path, max_attempts=3, backoff=60.0, recheck_after=None):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.recheck_after = recheck_after
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+
+        with self.conn:
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                source TEXT
+            )
+            """)
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(frontier)")}
+            for column in ("etag", "last_modified", "content_hash", "source"):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE frontier ADD COLUMN {column} TEXT")
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_frontier_url ON frontier(url)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(state, next_attempt_at)"
+            )
+
+    # source: どの一覧（区コードなど）で見つけたか
+    # 戻り値: 新しく見つかった URL の数
+    def add(self, urls, source=None):
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, updated_at, source) VALUES (?, ?, ?)",
+                [(url, time.time(), source) for url in urls],
+            )
+            return self.conn.total_changes - before
+
+    # 今取りに行くべき URL（未取得 + 再試行の時刻が来た失敗分
+    # + recheck_after 秒以上前に取った取得済み分）
+    # source を渡すとその一覧で見つけた URL だけ（他のシャードの分は取らない）
+    def due(self, urls=None, source=None):
+        now = time.time()
+        recheck_before = -1 if self.recheck_after is None else now - self.recheck_after
+        query = """
+            SELECT url FROM frontier
+            WHERE (state = 'queued'
+                   OR (state = 'failed' AND attempts < ? AND next_attempt_at <= ?)
+                   OR (state = 'fetched' AND updated_at <= ?))
+              AND (? IS NULL OR source = ?)
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                query, (self.max_attempts, now, recheck_before, source, source)
+            ).fetchall()
+
+        due = [row[0] for row in rows]
+        if urls is not None:
+            wanted = set(urls)
+            due = [url for url in due if url in wanted]
+        return due
+
+    # 戻り値: (etag, last_modified, content_hash)
+    def validators(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_hash FROM frontier WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return row or (None, None, None)
+
+    # 304 のときは validators を渡さない → 前回の値をそのまま残す
+    def mark_fetched(self, url, etag=None, last_modified=None, content_hash=None):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                UPDATE frontier
+                SET state = ?,
+                    attempts = 0,
+                    last_error = NULL,
+                    updated_at = ?,
+                    etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified),
+                    content_hash = COALESCE(?, content_hash)
+                WHERE url = ?
+            """, (FETCHED, time.time(), etag, last_modified, content_hash, url))
+
+    # 失敗するたびに待ち時間を倍にする（backoff, 2*backoff, 4*backoff ...）
+    def mark_failed(self, url, error):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                UPDATE frontier
+                SET state = ?,
+                    attempts = attempts + 1,
+                    next_attempt_at = ? + ? * (1 << attempts),
+                    last_error = ?,
+                    updated_at = ?
+                WHERE url = ?
+            """, (FAILED, now, self.backoff, str(error)[:200], now, url))
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT state, COUNT(*) FROM frontier GROUP BY state"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,212 @@
+import sqlite3
+import sys
+
+# =====================
+# 家賃の集計表（区 × 徒歩区分ごとの Welford 形式の途中結果）
+#   n, 平均, 偏差平方和, 偏差積和 を持っておけば
+#   件数・平均・相関係数は表の数十行を合わせるだけで出る（物件数によらない）
+#   properties に入った・変わった・消えた行はトリガーでその場で反映する
+#   → crawler / PropertyWriter / save_to_db のどれで書いても同じように更新される
+# =====================
+# pd.cut(bins=[0, 5, 10, 15, 20, 60]) と同じ区切り（右端を含む）
+WALK_BINS = [0, 5, 10, 15, 20, 60]
+WALK_LABELS = ["~5", "6-10", "11-15", "16-20", "21~"]
+OUT_OF_RANGE = -1  # 区分に入らない徒歩分数（0分以下・60分超）
+
+
+def walk_bucket(column="walk_minutes"):
+    whens = "\n".join(
+        f"        WHEN {column} > {lo} AND {column} <= {hi} THEN {i}"
+        for i, (lo, hi) in enumerate(zip(WALK_BINS, WALK_BINS[1:]))
+    )
+    return f"CASE\n{whens}\n        ELSE {OUT_OF_RANGE}\n    END"
+
+
+CREATE_STATS = """
+CREATE TABLE IF NOT EXISTS property_stats (
+    ward TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    mean_walk REAL NOT NULL DEFAULT 0.0,
+    mean_rent REAL NOT NULL DEFAULT 0.0,
+    m2_walk REAL NOT NULL DEFAULT 0.0,
+    m2_rent REAL NOT NULL DEFAULT 0.0,
+    c_walk_rent REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (ward, bucket)
+) WITHOUT ROWID
+"""
+
+
+# 1件足す（Welford の更新式。SET の右辺はすべて更新前の値）
+# トリガー内の OR IGNORE は外側の文の競合処理で上書きされるので NOT EXISTS で行を用意する
+def _add_sql(row):
+    key = f"ward = IFNULL({row}.ward, '') AND bucket = {walk_bucket(row + '.walk_minutes')}"
+    x, y = f"{row}.walk_minutes", f"{row}.rent"
+    return f"""
+    INSERT INTO property_stats (ward, bucket)
+    SELECT IFNULL({row}.ward, ''), {walk_bucket(x)}
+    WHERE NOT EXISTS (SELECT 1 FROM property_stats WHERE {key});
+    UPDATE property_stats SET
+        n = n + 1,
+        mean_walk = mean_walk + ({x} - mean_walk) / (n + 1),
+        mean_rent = mean_rent + ({y} - mean_rent) / (n + 1),
+        m2_walk = m2_walk + ({x} - mean_walk) * ({x} - mean_walk) * n / (n + 1),
+        m2_rent = m2_rent + ({y} - mean_rent) * ({y} - mean_rent) * n / (n + 1),
+        c_walk_rent = c_walk_rent + ({x} - mean_walk) * ({y} - mean_rent) * n / (n + 1)
+    WHERE {key};
+    """
+
+
+# 1件引く（足すときの逆）
+def _remove_sql(row):
+    key = f"ward = IFNULL({row}.ward, '') AND bucket = {walk_bucket(row + '.walk_minutes')}"
+    x, y = f"{row}.walk_minutes", f"{row}.rent"
+    return f"""
+    UPDATE property_stats SET
+        n = n - 1,
+        mean_walk = CASE WHEN n > 1 THEN (mean_walk * n - {x}) / (n - 1) ELSE 0.0 END,
+        mean_rent = CASE WHEN n > 1 THEN (mean_rent * n - {y}) / (n - 1) ELSE 0.0 END,
+        m2_walk = CASE WHEN n > 1
+            THEN m2_walk - ({x} - mean_walk) * ({x} - mean_walk) * n / (n - 1) ELSE 0.0 END,
+        m2_rent = CASE WHEN n > 1
+            THEN m2_rent - ({y} - mean_rent) * ({y} - mean_rent) * n / (n - 1) ELSE 0.0 END,
+        c_walk_rent = CASE WHEN n > 1
+            THEN c_walk_rent - ({x} - mean_walk) * ({y} - mean_rent) * n / (n - 1) ELSE 0.0 END
+    WHERE {key};
+    """
+
+
+def _valid(row):
+    return f"{row}.rent IS NOT NULL AND {row}.walk_minutes IS NOT NULL"
+
+
+TRIGGERS = {
+    "property_stats_insert": f"AFTER INSERT ON properties WHEN {_valid('NEW')}",
+    "property_stats_delete": f"AFTER DELETE ON properties WHEN {_valid('OLD')}",
+    "property_stats_update_old":
+        f"AFTER UPDATE OF rent, walk_minutes, ward ON properties WHEN {_valid('OLD')}",
+    "property_stats_update_new":
+        f"AFTER UPDATE OF rent, walk_minutes, ward ON properties WHEN {_valid('NEW')}",
+}
+TRIGGER_BODIES = {
+    "property_stats_insert": _add_sql("NEW"),
+    "property_stats_delete": _remove_sql("OLD"),
+    "property_stats_update_old": _remove_sql("OLD"),
+    "property_stats_update_new": _add_sql("NEW"),
+}
+
+
+# =====================
+# 途中結果（表の1行）と、その合算（Chan らの並列版 Welford）
+# =====================
+class RunningStats:
+    def __init__(self, n=0, mean_walk=0.0, mean_rent=0.0,
+                 m2_walk=0.0, m2_rent=0.0, c_walk_rent=0.0):
+        self.n = n
+        self.mean_walk = mean_walk
+        self.mean_rent = mean_rent
+        self.m2_walk = m2_walk
+        self.m2_rent = m2_rent
+        self.c_walk_rent = c_walk_rent
+
+    def merge(self, other):
+        n = self.n + other.n
+        if n == 0:
+            return self
+        dx = other.mean_walk - self.mean_walk
+        dy = other.mean_rent - self.mean_rent
+        w = self.n * other.n / n
+
+        self.mean_walk += dx * other.n / n
+        self.mean_rent += dy * other.n / n
+        self.m2_walk += other.m2_walk + dx * dx * w
+        self.m2_rent += other.m2_rent + dy * dy * w
+        self.c_walk_rent += other.c_walk_rent + dx * dy * w
+        self.n = n
+        return self
+
+    def correlation(self):
+        if self.m2_walk <= 0 or self.m2_rent <= 0:
+            return float("nan")
+        return self.c_walk_rent / (self.m2_walk * self.m2_rent) ** 0.5
+
+
+def init_stats(conn):
+    is_new = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'property_stats'"
+    ).fetchone()
+    with conn:
+        conn.execute(CREATE_STATS)
+        for name, when in TRIGGERS.items():
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} {when}\nBEGIN{TRIGGER_BODIES[name]}END"
+            )
+    if is_new:
+        rebuild_stats(conn)
+
+
+# properties から作り直す（トリガー導入前のデータや、誤差がたまったとき用）
+def rebuild_stats(conn):
+    bucket = walk_bucket()
+    valid = "rent IS NOT NULL AND walk_minutes IS NOT NULL"
+    with conn:
+        conn.execute("DELETE FROM property_stats")
+        conn.execute(f"""
+            INSERT INTO property_stats
+            WITH p AS (
+                SELECT IFNULL(ward, '') AS ward, {bucket} AS bucket, walk_minutes, rent
+                FROM properties WHERE {valid}
+            ),
+            m AS (
+                SELECT ward, bucket, COUNT(*) AS n,
+                       AVG(walk_minutes) AS mx, AVG(rent) AS my
+                FROM p GROUP BY ward, bucket
+            )
+            SELECT m.ward, m.bucket, m.n, m.mx, m.my,
+                   SUM((walk_minutes - mx) * (walk_minutes - mx)),
+                   SUM((rent - my) * (rent - my)),
+                   SUM((walk_minutes - mx) * (rent - my))
+            FROM p JOIN m ON p.ward = m.ward AND p.bucket = m.bucket
+            GROUP BY m.ward, m.bucket
+        """)
+
+
+# 戻り値: {bucket: RunningStats}（ward=None なら全区を合算）
+def load_stats(conn, ward=None):
+    query = """
+        SELECT bucket, n, mean_walk, mean_rent, m2_walk, m2_rent, c_walk_rent
+        FROM property_stats WHERE n > 0
+    """
+    params = ()
+    if ward:
+        query += " AND ward = ?"
+        params = (ward,)
+
+    buckets = {}
+    for bucket, *values in conn.execute(query, params):
+        buckets.setdefault(bucket, RunningStats()).merge(RunningStats(*values))
+    return buckets
+
+
+def summarize(buckets):
+    total = RunningStats()
+    for stats in buckets.values():
+        total.merge(stats)
+    return total
+
+
+if __name__ == "__main__":
+    # python rent_stats.py rebuild [db_path]
+    if sys.argv[1:2] != ["rebuild"]:
+        sys.exit("usage: python rent_stats.py rebuild [db_path]")
+
+    conn = sqlite3.connect(sys.argv[2] if len(sys.argv) > 2 else "suumo.db")
+    try:
+        init_stats(conn)
+        rebuild_stats(conn)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"再集計できません: {e}")
+    total = summarize(load_stats(conn))
+    conn.close()
+    print(f"再集計: {total.n} 件, 平均家賃 {total.mean_rent:.2f}, "
+          f"相関係数 {total.correlation():+.4f}")
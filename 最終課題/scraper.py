@@ -0,0 +1,220 @@
+import requests
+import time
+import re
+import sqlite3
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from rent_stats import init_stats
+from writer import PropertyWriter
+
+# =====================
+# 基本設定
+# =====================
+BASE_URL = "https://suumo.jp"
+SEARCH_URL = "https://suumo.jp/jj/chintai/ichiran/FR301FC001/"
+DB_PATH = "suumo.db"
+
+PARAMS = {
+    "ar": "030",     # 関東
+    "bs": "040",     # 賃貸
+    "ta": "13",      # 東京都
+    "sc": "13112",   # 世田谷区
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; UniversityAssignmentBot/1.0)"
+}
+
+# 東京23区（sc に渡す市区町村コード）
+WARD_CODES = [f"131{n:02d}" for n in range(1, 24)]
+
+# 所在地「東京都世田谷区太子堂1丁目」→「世田谷区」
+WARD_RE = re.compile(r"^(?:東京都)?(.+?[区市町村])")
+
+# =====================
+# DB初期化
+# =====================
+def init_db(db_path=None):
+    conn = sqlite3.connect(db_path or DB_PATH)
+    cur = conn.cursor()
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS properties (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT,
+        rent INTEGER,
+        walk_minutes INTEGER,
+        layout TEXT,
+        area REAL,
+        age INTEGER,
+        ward TEXT,
+        url TEXT
+    )
+    """)
+
+    # url を一意にする（既存の重複は古いものを残して消す）
+    has_index = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_properties_url'"
+    ).fetchone()
+    if not has_index:
+        cur.execute("""
+        DELETE FROM properties
+        WHERE id NOT IN (SELECT MIN(id) FROM properties GROUP BY url)
+        """)
+        cur.execute("CREATE UNIQUE INDEX idx_properties_url ON properties(url)")
+
+    conn.commit()
+
+    # 区 × 徒歩区分の集計表（書き込みのたびにトリガーで更新）
+    init_stats(conn)
+    conn.close()
+
+# =====================
+# 共通処理
+# =====================
+def get_soup(url, params=None):
+    res = requests.get(url, params=params, headers=HEADERS, timeout=10)
+    res.raise_for_status()
+    return BeautifulSoup(res.text, "html.parser")
+
+def parse_int(text):
+    if text is None:
+        return None
+    nums = re.findall(r"\d+", text)
+    return int(nums[0]) if nums else None
+
+# =====================
+# 一覧ページ → 詳細URL取得
+# =====================
+def extract_detail_urls(soup, base_url=BASE_URL):
+    urls = []
+    for a in soup.select("a.js-cassette_link_href"):
+        href = a.get("href")
+        if href:
+            urls.append(urljoin(base_url, href))
+    return list(set(urls))
+
+# =====================
+# 徒歩分数取得（重要修正ポイント）
+# =====================
+def extract_walk_minutes(soup):
+    minutes = []
+    texts = soup.find_all(string=re.compile("徒歩"))
+    for t in texts:
+        m = re.search(r"徒歩\s*(\d+)\s*分", t)
+        if m:
+            minutes.append(int(m.group(1)))
+    return min(minutes) if minutes else None
+
+def parse_ward(address):
+    m = WARD_RE.search(address)
+    return m.group(1) if m else None
+
+
+# =====================
+# 詳細ページ解析
+# =====================
+def extract_property_data(soup, url):
+    try:
+        # 物件名
+        h1 = soup.select_one("h1")
+        name = h1.get_text(strip=True) if h1 else None
+
+        # 家賃
+        rent_tag = soup.find("span", class_="property_view_note-emphasis")
+        rent = parse_int(rent_tag.get_text()) if rent_tag else None
+
+        # 徒歩分数
+        walk_minutes = extract_walk_minutes(soup)
+
+        layout = None
+        area = None
+        age = None
+        ward = None
+
+        # 基本情報テーブル
+        rows = soup.select("table.property_view_table tr")
+        for tr in rows:
+            th = tr.find("th")
+            td = tr.find("td")
+            if not th or not td:
+                continue
+
+            label = th.get_text(strip=True)
+            value = td.get_text(strip=True)
+
+            if label == "間取り":
+                layout = value
+            elif label == "専有面積":
+                area = float(value.replace("m2", "").replace("㎡", ""))
+            elif label == "築年数":
+                age = parse_int(value)
+            elif label == "所在地":
+                ward = parse_ward(value)
+
+        return {
+            "name": name,
+            "rent": rent,
+            "walk_minutes": walk_minutes,
+            "layout": layout,
+            "area": area,
+            "age": age,
+            "ward": ward,
+            "url": url
+        }
+
+    except Exception as e:
+        print("解析失敗:", url, e)
+        return None
+
+# =====================
+# DB保存
+# =====================
+def save_to_db(data):
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute("""
+    INSERT OR IGNORE INTO properties
+    (name, rent, walk_minutes, layout, area, age, ward, url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        data["name"],
+        data["rent"],
+        data["walk_minutes"],
+        data["layout"],
+        data["area"],
+        data["age"],
+        data["ward"],
+        data["url"]
+    ))
+    conn.commit()
+    conn.close()
+
+# =====================
+# メイン処理
+# =====================
+def main():
+    init_db()
+
+    with PropertyWriter(DB_PATH) as writer:
+        for page in range(1, 6):  # 取得ページ数（控えめ）
+            print(f"--- page {page} ---")
+            PARAMS["page"] = page
+
+            soup = get_soup(SEARCH_URL, PARAMS)
+            detail_urls = extract_detail_urls(soup)
+            print(f"  物件数: {len(detail_urls)}")
+
+            for url in detail_urls:
+                detail_soup = get_soup(url)
+                data = extract_property_data(detail_soup, url)
+
+                if data and data["rent"] and data["walk_minutes"]:
+                    writer.add(data)
+
+                time.sleep(1.5)  # サーバ負荷軽減
+
+            time.sleep(2)
+
+if __name__ == "__main__":
+    main()
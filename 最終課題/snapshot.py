@@ -0,0 +1,208 @@
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from rent_stats import WALK_BINS, WALK_LABELS
+
+# =====================
+# properties の列ごとのスナップショット（NumPy の .npy を列ごとに1ファイル）
+#   数値列: int32 / float32（NULL は -1 / NaN）
+#   文字列列（ward, layout）: 辞書の番号（int16、NULL は -1）+ meta.json に辞書
+#   読むときは np.load(mmap_mode="r") → ファイルをそのままメモリに割り当てるだけ
+# =====================
+SNAPSHOT_DIR = "suumo_snapshot"
+NULL = -1
+
+# 列名: (dtype, 文字列を辞書の番号にするか)
+SNAPSHOT_COLUMNS = {
+    "rent": ("int32", False),
+    "walk_minutes": ("int32", False),
+    "age": ("int32", False),
+    "area": ("float32", False),
+    "ward": ("int16", True),
+    "layout": ("int16", True),
+}
+
+
+def _null_value(dtype):
+    return np.nan if np.dtype(dtype).kind == "f" else NULL
+
+
+# =====================
+# 書き出し（batch 行ずつ読むので、行数が増えてもメモリは増えない）
+# =====================
+def export_snapshot(db_path, out_dir=SNAPSHOT_DIR, batch=100_000):
+    conn = sqlite3.connect(db_path)
+    # 件数・辞書・本体の読み出しを1つの読み取りトランザクションにする
+    # （途中で crawler が書いても、最初に数えた n 行とずれない）
+    conn.execute("BEGIN")
+    n = conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+
+    categories = {}
+    for name, (_, encode) in SNAPSHOT_COLUMNS.items():
+        if encode:
+            categories[name] = [
+                row[0] for row in conn.execute(
+                    f"SELECT DISTINCT {name} FROM properties "
+                    f"WHERE {name} IS NOT NULL ORDER BY {name}"
+                )
+            ]
+
+    # 書き終わるまでは .tmp に書き、最後に入れ替える
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    arrays = {
+        name: np.lib.format.open_memmap(
+            os.path.join(tmp_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n,)
+        )
+        for name, (dtype, _) in SNAPSHOT_COLUMNS.items()
+    }
+    codes = {name: {v: i for i, v in enumerate(cats)} for name, cats in categories.items()}
+
+    cur = conn.execute(f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM properties ORDER BY id")
+    start = 0
+    while True:
+        rows = cur.fetchmany(batch)
+        if not rows:
+            break
+        end = start + len(rows)
+        for i, (name, (dtype, encode)) in enumerate(SNAPSHOT_COLUMNS.items()):
+            values = [row[i] for row in rows]
+            if encode:
+                table = codes[name]
+                values = [NULL if v is None else table[v] for v in values]
+            else:
+                null = _null_value(dtype)
+                values = [null if v is None else v for v in values]
+            arrays[name][start:end] = values
+        start = end
+    conn.rollback()
+    conn.close()
+
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    meta = {
+        "rows": n,
+        "exported_at": time.time(),
+        "source": os.path.abspath(db_path),
+        "dtypes": {name: dtype for name, (dtype, _) in SNAPSHOT_COLUMNS.items()},
+        "categories": categories,
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return n
+
+
+# =====================
+# 読み込み
+# =====================
+class Snapshot:
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        with open(os.path.join(snapshot_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.rows = self.meta["rows"]
+        self.categories = self.meta["categories"]
+        self.arrays = {
+            name: np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode="r")
+            for name in self.meta["dtypes"]
+        }
+
+    # properties と同じ条件（rent, walk_minutes が NULL でない）の行の印
+    def mask(self, ward=None, min_rent=None, max_rent=None, max_walk=None):
+        rent = self.arrays["rent"]
+        walk = self.arrays["walk_minutes"]
+        mask = (rent != NULL) & (walk != NULL)
+        if ward:
+            cats = self.categories["ward"]
+            if ward not in cats:
+                return np.zeros(self.rows, dtype=bool)
+            mask &= self.arrays["ward"] == cats.index(ward)
+        if min_rent is not None:
+            mask &= rent >= min_rent
+        if max_rent is not None:
+            mask &= rent <= max_rent
+        if max_walk is not None:
+            mask &= walk <= max_walk
+        return mask
+
+    # 全行が対象ならコピーせず memmap のまま DataFrame にする
+    def column(self, name, mask=None):
+        array = self.arrays[name]
+        if mask is not None and not mask.all():
+            array = array[mask]
+        if name in self.categories:
+            return pd.Categorical.from_codes(array, self.categories[name])
+        if array.dtype.kind == "i":
+            # NULL(-1) が混ざる列は欠損ありの整数列にする（値はコピーしない）
+            nulls = array == NULL
+            if nulls.any():
+                return pd.arrays.IntegerArray(np.asarray(array), nulls)
+        return array
+
+    def load(self, columns=("rent", "walk_minutes"), **filters):
+        mask = self.mask(**filters)
+        return pd.DataFrame(
+            {name: self.column(name, mask) for name in columns}, copy=False
+        )
+
+    # ---------- 集計（NumPy で直接） ----------
+    def count(self, **filters):
+        return int(self.mask(**filters).sum())
+
+    def average_by_walk(self, **filters):
+        mask = self.mask(**filters)
+        walk = self.arrays["walk_minutes"][mask]
+        rent = self.arrays["rent"][mask].astype(np.float64)
+
+        # pd.cut と同じ右端を含む区分（範囲外は -1）
+        bucket = np.searchsorted(WALK_BINS, walk, side="left") - 1
+        bucket[(walk <= WALK_BINS[0]) | (walk > WALK_BINS[-1])] = -1
+        inside = bucket >= 0
+
+        k = len(WALK_LABELS)
+        sums = np.bincount(bucket[inside], weights=rent[inside], minlength=k)
+        counts = np.bincount(bucket[inside], minlength=k)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+
+        return pd.Series(means, index=pd.CategoricalIndex(
+            WALK_LABELS, categories=WALK_LABELS, ordered=True, name="walk_cat"
+        ), name="rent")
+
+    def correlation(self, **filters):
+        mask = self.mask(**filters)
+        x = self.arrays["walk_minutes"][mask].astype(np.float64)
+        y = self.arrays["rent"][mask].astype(np.float64)
+        if len(x) < 2:
+            return float("nan")
+        x -= x.mean()
+        y -= y.mean()
+        sxx, syy = x @ x, y @ y
+        if not sxx or not syy:
+            return float("nan")
+        return float(x @ y / (sxx * syy) ** 0.5)
+
+
+if __name__ == "__main__":
+    # python snapshot.py export [db_path] [out_dir]
+    if sys.argv[1:2] != ["export"]:
+        sys.exit("usage: python snapshot.py export [db_path] [out_dir]")
+
+    db_path = sys.argv[2] if len(sys.argv) > 2 else "suumo.db"
+    out_dir = sys.argv[3] if len(sys.argv) > 3 else SNAPSHOT_DIR
+    start = time.perf_counter()
+    n = export_snapshot(db_path, out_dir)
+    print(f"書き出し: {n} 件 → {out_dir} ({time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+import time
+
+# =====================
+# properties へのまとめ書き
+#   add() でためておき、batch_size 件 / flush_interval 秒 / close() のどれかで
+#   executemany + 1コミットで書き込む。url が同じ行は中身が変わったときだけ更新
+#   on_flush(urls): コミットし終わった行の url を渡す（crawler はここで frontier を fetched にする）
+# =====================
+COLUMNS = ("name", "rent", "walk_minutes", "layout", "area", "age", "ward", "url")
+
+UPSERT_PROPERTY = f"""
+    INSERT INTO properties ({", ".join(COLUMNS)})
+    VALUES ({", ".join("?" for _ in COLUMNS)})
+    ON CONFLICT(url) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c != "url")}
+    WHERE {" OR ".join(f"{c} IS NOT excluded.{c}" for c in COLUMNS if c != "url")}
+"""
+
+
+class PropertyWriter:
+    def __init__(self, db_path, batch_size=500, flush_interval=5.0, on_flush=None):
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+
+        # 何も add されなくても flush_interval ごとに書き出す
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._flush_loop, daemon=True)
+        self._timer.start()
+
+    def add(self, data):
+        with self.lock:
+            self.buffer.append(tuple(data[c] for c in COLUMNS))
+            if len(self.buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        with self.conn:
+            cur = self.conn.executemany(UPSERT_PROPERTY, self.buffer)
+        self.written += cur.rowcount
+        rows, self.buffer = self.buffer, []
+        if self.on_flush:
+            url = COLUMNS.index("url")
+            self.on_flush([row[url] for row in rows])
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval / 2):
+            with self.lock:
+                if time.monotonic() - self.last_flush >= self.flush_interval:
+                    self._flush_locked()
+
+    def close(self):
+        self._stop.set()
+        self._timer.join()
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()